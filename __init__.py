@@ -37,6 +37,7 @@ from bpy.app.handlers import persistent
 # from . addon.utility import addon, update
 from . addon import preference, property
 from . addon.interface import operator, panel
+from . addon.utility import metadata, pool
 import uuid
 
 @persistent
@@ -57,6 +58,9 @@ def register():
     operator.register()
     panel.register()
     bpy.app.handlers.depsgraph_update_pre.append(depsgraph_update_pre_handler)
+    bpy.app.handlers.load_pre.append(pool.release_handler)
+    bpy.app.handlers.save_pre.append(pool.release_handler)
+    metadata.start_indexing(first_interval=5)
 
 
 def unregister():
@@ -66,6 +70,9 @@ def unregister():
     operator.unregister()
     preference.unregister()
     bpy.app.handlers.depsgraph_update_pre.remove(depsgraph_update_pre_handler)
+    bpy.app.handlers.load_pre.remove(pool.release_handler)
+    bpy.app.handlers.save_pre.remove(pool.release_handler)
+    metadata.stop_indexing()
     
 
 
@@ -9,7 +9,7 @@ from bpy.props import StringProperty, BoolProperty, PointerProperty, IntProperty
 from bpy_extras import mesh_utils
 from kitops.addon.utility import insert, collections, addon as kitops_addon
 from .. import property
-from .. utility import addon, update, inserts, distributors, messages
+from .. utility import addon, update, inserts, distributors, messages, metadata, library, pool, booleans
 from .. utility.encoding import RecipeEncoder, decode_recipe
 import os
 import json
@@ -22,12 +22,19 @@ class add_random_inserts():
 
     layer_id : StringProperty()
 
+    # materialize layers from the plan stored with their preview instead of laying them out again.
+    use_preview_plan : BoolProperty(default=False, options={'SKIP_SAVE'})
+
     # these are used for the insert module.
     main = None
     boolean_target = None
     inserts = list()
     init_active = None
     init_selected = list()
+    insert_library = None
+    deferred_booleans = None
+    material_table = None
+    relevance_check = None
 
 
 
@@ -111,11 +118,25 @@ class add_random_inserts():
         """Create multiple inserts and add them to random points on the target object"""
 
         update.inserts_init(self, context)
-        if self.layer_id == '':
-            update.inserts_add(self, context)
-        else:
-            layer = context.scene.kitopssynth.layers[self.layer_id]
-            update.inserts_add_layer(self, context, layer, [])
+        self.insert_library = library.InsertLibrary()
+        self.deferred_booleans = booleans.DeferredBooleans()
+        self.material_table = library.MaterialTable()
+        self.relevance_check = booleans.RelevanceCheck()
+        try:
+            if self.layer_id == '':
+                update.inserts_add(self, context)
+            else:
+                layer = context.scene.kitopssynth.layers[self.layer_id]
+                update.inserts_add_layer(self, context, layer, [])
+        finally:
+            self.insert_library.clear()
+            self.insert_library = None
+            self.deferred_booleans.apply()
+            self.deferred_booleans = None
+            self.material_table = None
+            if self.relevance_check.irrelevant_count:
+                messages.add_message(context, str(self.relevance_check.irrelevant_count) + ' cutters do not touch their target and were left without booleans.')
+            self.relevance_check = None
 
         self.exit(context)
 
@@ -161,6 +182,30 @@ class KO_OT_synth_ConfirmOperator(Operator):
 
 
 
+class KO_OT_synth_commit_preview(Operator):
+    """"Operator class for turning the previewed layout into final INSERTs"""
+    bl_idname = 'ko.synth_commit_preview'
+    bl_label = 'Commit Preview'
+    bl_description = 'Add the previewed INSERTs as final INSERTs without laying them out again'
+    bl_options = {'UNDO', 'INTERNAL'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.scene.kitopssynth.preview_mode and update.poll_add_random_inserts(context)
+
+    def execute(self, context):
+        # leave preview mode without the automatic redo, which would lay everything out again.
+        old_update_state = context.scene.kitopssynth.auto_update
+        context.scene.kitopssynth.auto_update = False
+        try:
+            context.scene.kitopssynth.preview_mode = False
+        finally:
+            context.scene.kitopssynth.auto_update = old_update_state
+
+        bpy.ops.ko.synth_add_random_inserts('INVOKE_DEFAULT', layer_id='', use_preview_plan=True)
+        return {'FINISHED'}
+
+
 class KO_OT_synth_clear_from_selection(Operator):
     """"Operator class for clearing INSERTs"""
     bl_idname = 'ko.synth_clear_from_selection'
@@ -233,7 +278,10 @@ class KO_OT_synth_clear_layer(Operator):
                     if insert_obj is None:
                         continue
 
-                    if not insert_obj.kitopssynth_insert.is_preview_insert:
+                    # keep the INSERT in the layer's pool so that the next run can move it back into place.
+                    if pool.can_park(insert_obj):
+                        pool.park(insert_obj, active_object, self.layer_uid)
+                    elif not insert_obj.kitopssynth_insert.is_preview_insert:
                         inserts.delete_hierarchy(insert_obj, active_object)
                     else:
                         inserts.delete_hierarchy(insert_obj)
@@ -296,6 +344,9 @@ class KO_OT_synth_bake(Operator):
                 self.report({'ERROR'}, error_message)
                 return {'CANCELLED'}
 
+            # parked INSERTs are out of the scene and must not be left behind in the baked file.
+            pool.release_all()
+
             # wipe properties of any available INSERTs.
             key = property.generate_insert_map_key(active_object)
             if key in active_object.kitopssynth_insert_map:
@@ -728,6 +779,7 @@ class KO_OT_RefreshSynthKPACKS(Operator):
 
     def execute(self, context):
         property.reload_kpacks(context)
+        metadata.start_indexing()
         return {'FINISHED'}
 
 class KO_OT_ResetAll(Operator):
@@ -960,6 +1012,7 @@ class KO_OT_synth_copy_layer_face_selection(Operator):
 
 classes = [KO_OT_synth_add_random_inserts, 
             KO_OT_synth_ConfirmOperator,
+            KO_OT_synth_commit_preview,
             KO_OT_synth_clear_from_selection,
             KO_OT_synth_clear_layer,
             KO_OT_synth_clear_all,
@@ -4,7 +4,7 @@ import bpy
 from bpy.types import Panel, UIList, Menu
 from bpy.utils import register_class, unregister_class
 from .. import property
-from .. utility import addon, distributors, inserts, update
+from .. utility import addon, distributors, inserts, update, metadata, instancing, booleans
 from kitops.addon.utility import insert, addon as kitops_addon
 from bpy.props import BoolProperty
 
@@ -136,7 +136,7 @@ class KO_PT_SYNTH_UI_PT_ActionsPanel(bpy.types.Panel):
             row = col.row()
             row.label(text="Preview Type")
             row.prop(context.scene.kitopssynth, 'preview_type', text="", expand=False)
-            if context.scene.kitopssynth.preview_type == 'FAST':
+            if context.scene.kitopssynth.preview_type in {'FAST', 'PROXY'}:
                 row = col.row()
                 row.label(text="Fast Mode Color")
                 row.prop(context.scene.kitopssynth, 'preview_color', text="")
@@ -153,6 +153,8 @@ class KO_PT_SYNTH_UI_PT_ActionsPanel(bpy.types.Panel):
             props = row.operator('ko.synth_add_random_inserts', text="DO IT")
             props.layer_id = ''
         row.operator('ko.synth_clear_all', text="CLEAR")
+        if context.scene.kitopssynth.preview_mode:
+            col.operator('ko.synth_commit_preview', text="Commit Preview")
 
         col = box.column(align=True)
         col.prop(context.scene.kitopssynth, 'seed', text="Main Seed")
@@ -352,6 +354,13 @@ class KO_PT_SYNTH_UI_PT_InsertsPanel(bpy.types.Panel):
                 row3 = row1.row(align=True)
                 row3.prop(insert_entry, 'use_once', icon='SNAP_FACE_CENTER', text='', icon_only=True)
 
+                insert_metadata = metadata.drawn_insert_metadata(insert_entry)
+                if insert_metadata is not None:
+                    row1 = col1.row(align=True)
+                    row1.enabled = insert_entry.is_enabled
+                    row1.alert = insert_metadata['polygon_count'] > metadata.heavy_polygon_count
+                    row1.label(text=str(insert_metadata['polygon_count']) + ' faces, ' + str(insert_metadata['cutter_count']) + ' cutters', icon='INFO')
+
             
 class KO_PT_SYNTH_UI_PT_PlacementStylePanel(bpy.types.Panel):
     """Properties panel for add-on operators."""
@@ -464,11 +473,29 @@ class KO_PT_SYNTH_UI_PT_OptimizePanel(bpy.types.Panel):
             return
         option = addon.option()
 
-        if bpy.app.version[1] > 90:
-            box = layout.box()
-            box.column().label(text='Optimize')
+        box = layout.box()
+        box.column().label(text='Optimize')
+        if bpy.app.version >= (2, 91, 0):
             row = box.row()
             row.prop(preference, 'boolean_solver', expand=True)
+        row = box.row()
+        row.prop(preference, 'use_linked_data')
+        if booleans.is_supported():
+            row.prop(preference, 'use_cutter_collection')
+        if bpy.app.version >= (2, 91, 0):
+            row = box.row()
+            row.prop(preference, 'use_cutter_lod')
+            sub = row.row()
+            sub.active = preference.use_cutter_lod
+            sub.prop(preference, 'cutter_lod_size')
+        row = box.row()
+        row.prop(preference, 'cull_size')
+        sub = row.row()
+        sub.active = preference.cull_size > 0
+        sub.prop(preference, 'cull_mode', text='')
+        if instancing.is_supported():
+            row = box.row()
+            row.prop(preference, 'output_mode', expand=True)
 
     
 
@@ -533,13 +560,9 @@ classes = [KO_SYNTH_LAYER_ENTRY_UL_List,
 
 def register():
     for cls in classes:
-        if cls == KO_PT_SYNTH_UI_PT_OptimizePanel and bpy.app.version[1] <= 90:
-            continue
         register_class(cls)
 
 
 def unregister():
     for cls in classes:
-        if cls == KO_PT_SYNTH_UI_PT_OptimizePanel and bpy.app.version[1] <= 90:
-            continue
         unregister_class(cls)
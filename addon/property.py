@@ -6,7 +6,7 @@ from bpy.types import PropertyGroup, EnumProperty
 from bpy.props import *
 from bpy.utils import register_class, unregister_class
 from kitops.addon.utility import insert, enums, id, update as kitops_update, addon as kitops_addon
-from . utility import addon, update, distributors
+from . utility import addon, update, distributors, layer_collections
 import time
 
 
@@ -45,8 +45,13 @@ class synth_layer_face_map(PropertyGroup):
 class synth_object_ref(PropertyGroup):
     insert_obj :  PointerProperty(type=bpy.types.Object)
 
+class synth_collection_ref(PropertyGroup):
+    collection :  PointerProperty(type=bpy.types.Collection)
+
 class synth_layer_ref(PropertyGroup):
     inserts: CollectionProperty(type=synth_object_ref)
+    fingerprint: StringProperty(default='')
+    plan: StringProperty(default='')
 
 class synth_insert_map(PropertyGroup):
     layers: CollectionProperty(type=synth_layer_ref)
@@ -168,13 +173,18 @@ class kitops_synth_insert_entry(PropertyGroup):
 
 
 
+def update_layer_enabled(self, context):
+    """Show or hide the layer's INSERTs with its collection, and turn its booleans on or off with them."""
+    layer_collections.set_visible(self, self.is_enabled)
+    return None
+
 class kitops_synth_layer(PropertyGroup):
 
     index : IntProperty(default=0)
 
     layer_name : StringProperty(default="Untitled")
 
-    is_enabled : BoolProperty(default=True, name='Enable', description='Enable Layer')
+    is_enabled : BoolProperty(default=True, name='Enable', description='Enable Layer', update=update_layer_enabled)
 
     inserts : CollectionProperty(name='KIT OPS SYNTH Objects', type=kitops_synth_insert_entry)
 
@@ -553,10 +563,68 @@ class kitops_synth_layer(PropertyGroup):
         description='',
         items=[
             ('FAST', 'Fast', 'fast solver for booleans'),
-            ('EXACT', 'Exact', 'exact solver for booleans')],
+            ('EXACT', 'Exact', 'exact solver for booleans'),
+            ('AUTO', 'Auto', 'choose the solver for each INSERT from the complexity of its cutters')],
         default='FAST',
         update=inserts_redo_update)
 
+    output_mode: EnumProperty(
+        name='Output',
+        description='How the INSERTs of this layer are added to the scene',
+        items=[
+            ('OBJECTS', 'Objects', 'Add every INSERT as objects with boolean modifiers on the target'),
+            ('INSTANCES', 'Instances', 'Instance the INSERTs on a point cloud with a single Geometry Nodes modifier on the target')],
+        default='OBJECTS',
+        update=inserts_redo_update)
+
+    use_linked_data: BoolProperty(
+        name = 'Linked Data',
+        description = 'Share mesh data between all placements of the same INSERT instead of giving each its own copy',
+        default = False,
+        update=inserts_redo_update
+        )
+
+    use_cutter_collection: BoolProperty(
+        name = 'Cutter Collection',
+        description = 'Cut the target with all cutters of this layer through a single boolean modifier',
+        default = False,
+        update=inserts_redo_update
+        )
+
+    use_cutter_lod: BoolProperty(
+        name = 'Cutter LOD',
+        description = 'Cut with simplified cutters where EXACT booleans use small INSERTs',
+        default = False,
+        update=inserts_redo_update
+        )
+
+    cutter_lod_size : FloatProperty(
+            name='LOD Size',
+            description='Cutters smaller than this are simplified, more so the smaller they are',
+            min=0,
+            default=0.1,
+            subtype='DISTANCE',
+            update=inserts_redo_update
+            )
+
+    cull_size : FloatProperty(
+            name='Cull Size',
+            description='INSERTs that end up smaller than this are culled. 0 culls nothing',
+            min=0,
+            default=0,
+            subtype='DISTANCE',
+            update=inserts_redo_update
+            )
+
+    cull_mode: EnumProperty(
+        name='Culled INSERTs',
+        description='What to do with INSERTs below the cull size',
+        items=[
+            ('NO_BOOLEANS', 'No Booleans', 'Place culled INSERTs without their cutters'),
+            ('SKIP', 'Skip', 'Do not place culled INSERTs at all')],
+        default='NO_BOOLEANS',
+        update=inserts_redo_update)
+
 
 class kitops_synth_message(PropertyGroup):
     text : StringProperty()
@@ -572,7 +640,8 @@ def update_selection(self, context):
 
 preview_types = [
     ("WIREFRAME", "Wireframe", "", 0),
-    ("FAST", "Fast", "", 1)
+    ("FAST", "Fast", "", 1),
+    ("PROXY", "Proxy", "", 2)
 ]
 
 class kitops_synth(PropertyGroup):
@@ -645,6 +714,39 @@ class kitops_synth_insert(PropertyGroup):
                         name = 'Is a preview INSERT',
                         default=False)
 
+    placement_key : StringProperty(
+                        name = 'Placement Key',
+                        description = 'Identifies the INSERT and mode this object was added with so it can be reused',
+                        default='')
+
+    is_instancer : BoolProperty(
+                        name = 'Is a layer instancing point cloud',
+                        default=False)
+
+    instance_collections : CollectionProperty(type=synth_collection_ref)
+
+    cuts_target : BoolProperty(
+                        name = 'Cuts the target',
+                        description = 'Whether this cutter touches its target, so that its boolean does anything',
+                        default=True)
+
+    pool_layer : StringProperty(
+                        name = 'Pool Layer',
+                        description = 'The layer whose pool this INSERT is parked in',
+                        default='')
+
+    pooled_collections : CollectionProperty(type=synth_collection_ref)
+
+    pool_target : PointerProperty(
+                        name = 'Pool Target',
+                        description = 'The target this INSERT was parked from',
+                        type=bpy.types.Object)
+
+    pooled_booleans : StringProperty(
+                        name = 'Pooled Booleans',
+                        description = 'The boolean modifiers this cutter had on the target before it was parked',
+                        default='')
+
 class kitops_synth_iterator(PropertyGroup):
 
     file_path: StringProperty(
@@ -673,6 +775,7 @@ def get_synt_key_name(index, entry):
     return entry.name
 
 classes = [synth_object_ref, 
+            synth_collection_ref,
             synth_layer_ref, 
             synth_insert_map, 
             kitops_synth_insert_entry, 
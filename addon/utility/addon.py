@@ -25,4 +25,17 @@ def option():
     # Made this false as we are not auto scaling.
     option.auto_scale = False
 
-    return option
\ No newline at end of file
+    return option
+
+def config_path(filename):
+    """Returns the path of a file in this addon's config directory."""
+    directory = bpy.utils.user_resource('CONFIG', path=name, create=True)
+    return os.path.join(directory, filename)
+
+def file_stamp(file_path):
+    """Returns the modification time and size of a file, or None if it cannot be read, to tell whether caches made from it are current."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
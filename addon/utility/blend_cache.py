@@ -0,0 +1,54 @@
+# Arrays generated from INSERT blends, kept in memory and in npz files in the config directory, and made again when a blend changes.
+import os
+import hashlib
+import numpy as np
+from . import addon
+
+
+class BlendFileCache():
+    """A cache of arrays made from INSERT blends, one npz file per blend in a directory of the config directory.
+
+    make returns a dict of arrays for a blend, or None if nothing can be made from it; unpack turns such a dict into the value that is returned."""
+
+    def __init__(self, directory_name, version, make, unpack=None):
+        self.directory_name = directory_name
+        self.version = version
+        self.make = make
+        self.unpack = unpack
+        self.entries = {}
+
+    def _path(self, blend_path):
+        directory = addon.config_path(self.directory_name)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, hashlib.sha1(blend_path.encode('utf-8')).hexdigest() + '.npz')
+
+    def _load(self, cache_path, stamp):
+        try:
+            with np.load(cache_path) as cache_file:
+                if int(cache_file['version']) == self.version and tuple(cache_file['stamp']) == stamp:
+                    return {name : cache_file[name] for name in cache_file.files if name not in {'version', 'stamp'}}
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def get(self, blend_path):
+        """Returns the value for an INSERT blend, making and saving it if there is no up to date one on disk."""
+        stamp = addon.file_stamp(blend_path)
+        if stamp is None:
+            return None
+        if blend_path in self.entries and self.entries[blend_path][0] == stamp:
+            return self.entries[blend_path][1]
+
+        cache_path = self._path(blend_path)
+        arrays = self._load(cache_path, stamp)
+        if arrays is None:
+            arrays = self.make(blend_path)
+            if arrays is not None:
+                try:
+                    np.savez(cache_path, version=self.version, stamp=np.array(stamp, dtype=np.float64), **arrays)
+                except OSError:
+                    pass
+
+        value = self.unpack(arrays) if arrays is not None and self.unpack is not None else arrays
+        self.entries[blend_path] = (stamp, value)
+        return value
@@ -0,0 +1,387 @@
+# Read only access to .blend files without bpy, so KPACKs can be indexed outside of Blender's main thread.
+import gzip
+import struct
+
+try: import zstandard
+except ImportError: zstandard = None
+
+
+class BlendFileError(Exception):
+    pass
+
+
+_gzip_magic = b'\x1f\x8b'
+_zstd_magic = b'\x28\xb5\x2f\xfd'
+
+# Object types and Custom Data types we need to know about.
+OB_MESH = 1
+CD_PROP_FLOAT3 = 48
+
+# the index of CUTTER in the items of the kitops.type enum property, which is stored as an int.
+KITOPS_TYPE_CUTTER = 2
+
+# IDProperty types.
+IDP_INT = 1
+IDP_GROUP = 6
+IDP_BOOLEAN = 10
+
+_primitive_formats = {
+    'char' : 'b',
+    'uchar' : 'B',
+    'int8_t' : 'b',
+    'uint8_t' : 'B',
+    'short' : 'h',
+    'ushort' : 'H',
+    'int16_t' : 'h',
+    'uint16_t' : 'H',
+    'int' : 'i',
+    'uint' : 'I',
+    'int32_t' : 'i',
+    'uint32_t' : 'I',
+    'float' : 'f',
+    'double' : 'd',
+    'int64_t' : 'q',
+    'uint64_t' : 'Q',
+    'long' : 'i',
+    'ulong' : 'I',
+}
+
+
+def _read_file_bytes(file_path):
+    """Read a .blend file into memory, decompressing it if necessary."""
+    with open(file_path, 'rb') as blend_file:
+        data = blend_file.read()
+    if data[:2] == _gzip_magic:
+        data = gzip.decompress(data)
+    elif data[:4] == _zstd_magic:
+        if zstandard is None:
+            raise BlendFileError('zstandard is required to read compressed file: ' + file_path)
+        # Blender writes compressed files as a series of frames so that they can be read in parts.
+        with zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True) as reader:
+            data = reader.read()
+    if data[:7] != b'BLENDER':
+        raise BlendFileError('Not a .blend file: ' + file_path)
+    return data
+
+
+class Field():
+    """A field of a DNA struct."""
+
+    def __init__(self, type_name, name, offset, size, is_pointer, array_size):
+        self.type_name = type_name
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.is_pointer = is_pointer
+        self.array_size = array_size
+
+
+class Struct():
+    """A DNA struct definition."""
+
+    def __init__(self, type_name, size):
+        self.type_name = type_name
+        self.size = size
+        self.fields = {}
+
+
+def _field_name(dna_name):
+    """Strip pointer, function and array syntax from a DNA field name, e.g. '*mvert' or 'co[3]'."""
+    name = dna_name.split('[')[0]
+    return name.replace('(', '').replace(')', '').replace('*', '')
+
+def _array_size(dna_name):
+    array_size = 1
+    for dimension in dna_name.split('[')[1:]:
+        array_size *= int(dimension.split(']')[0])
+    return array_size
+
+
+class SDNA():
+    """The DNA struct definitions a .blend file was written with."""
+
+    def __init__(self, data, offset, pointer_size, endian):
+        if data[offset:offset + 8] != b'SDNA' + b'NAME':
+            raise BlendFileError('Invalid SDNA block')
+        position = offset + 8
+
+        def read_int():
+            nonlocal position
+            value = struct.unpack_from(endian + 'i', data, position)[0]
+            position += 4
+            return value
+
+        def read_strings(count):
+            nonlocal position
+            strings = []
+            for i in range(count):
+                end = data.index(b'\0', position)
+                strings.append(data[position:end].decode('utf-8', 'replace'))
+                position = end + 1
+            return strings
+
+        def align():
+            nonlocal position
+            position = offset + ((position - offset + 3) & ~3)
+
+        names = read_strings(read_int())
+        align()
+        if data[position:position + 4] != b'TYPE':
+            raise BlendFileError('Invalid SDNA TYPE section')
+        position += 4
+        type_names = read_strings(read_int())
+        align()
+        if data[position:position + 4] != b'TLEN':
+            raise BlendFileError('Invalid SDNA TLEN section')
+        position += 4
+        type_sizes = list(struct.unpack_from(endian + str(len(type_names)) + 'h', data, position))
+        position += 2 * len(type_names)
+        align()
+        if data[position:position + 4] != b'STRC':
+            raise BlendFileError('Invalid SDNA STRC section')
+        position += 4
+
+        self.structs = []
+        self.structs_by_name = {}
+        for i in range(read_int()):
+            type_index, field_count = struct.unpack_from(endian + '2h', data, position)
+            position += 4
+            dna_struct = Struct(type_names[type_index], type_sizes[type_index])
+            field_offset = 0
+            for j in range(field_count):
+                field_type_index, name_index = struct.unpack_from(endian + '2h', data, position)
+                position += 4
+                dna_name = names[name_index]
+                is_pointer = dna_name.startswith('*') or dna_name.startswith('(*')
+                array_size = _array_size(dna_name)
+                size = (pointer_size if is_pointer else type_sizes[field_type_index]) * array_size
+                name = _field_name(dna_name)
+                dna_struct.fields[name] = Field(type_names[field_type_index], name, field_offset, size, is_pointer, array_size)
+                field_offset += size
+            self.structs.append(dna_struct)
+            self.structs_by_name[dna_struct.type_name] = dna_struct
+
+
+class Block():
+    """A file block, e.g. an ID data block or an array it points to."""
+
+    def __init__(self, code, sdna_index, address, size, count, offset):
+        self.code = code
+        self.sdna_index = sdna_index
+        self.address = address
+        self.size = size
+        self.count = count
+        self.offset = offset
+
+
+class StructInstance():
+    """An instance of a DNA struct at an offset into the file."""
+
+    def __init__(self, blend_file, dna_struct, offset):
+        self.blend_file = blend_file
+        self.dna_struct = dna_struct
+        self.offset = offset
+
+    def has(self, name):
+        return name in self.dna_struct.fields
+
+    def get(self, path, default=None):
+        """Get a field value, with '.' separating nested struct fields e.g. 'id.name'."""
+        instance = self
+        names = path.split('.')
+        for name in names[:-1]:
+            instance = instance.get(name)
+            if not isinstance(instance, StructInstance):
+                return default
+        field = instance.dna_struct.fields.get(names[-1])
+        if field is None:
+            return default
+        return instance.blend_file.read_field(field, instance.offset + field.offset)
+
+    def first_of(self, names, default=None):
+        """Get the first of a number of fields that exists, for fields that have been renamed between versions."""
+        for name in names:
+            if self.has(name):
+                return self.get(name)
+        return default
+
+
+class BlendFile():
+    """A .blend file read into memory."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.data = data = _read_file_bytes(file_path)
+
+        if data[7:8].isdigit():
+            # newer header: BLENDER<header size>-<format version><endian><version>, with 64 bit block lengths.
+            header_size = int(data[7:9])
+            format_version = int(data[10:12])
+            if format_version != 1:
+                raise BlendFileError('Unsupported .blend file format version: ' + str(format_version))
+            self.pointer_size = 8
+            self.endian = '<' if data[12:13] == b'v' else '>'
+            self.version = int(data[13:header_size])
+            block_header_format = self.endian + '4siQqq'
+            block_header_fields = ('code', 'sdna_index', 'address', 'size', 'count')
+        else:
+            header_size = 12
+            self.pointer_size = 8 if data[7:8] == b'-' else 4
+            self.endian = '<' if data[8:9] == b'v' else '>'
+            self.version = int(data[9:12])
+            block_header_format = self.endian + ('4siQii' if self.pointer_size == 8 else '4siIii')
+            block_header_fields = ('code', 'size', 'address', 'sdna_index', 'count')
+        block_header_size = struct.calcsize(block_header_format)
+        self.pointer_format = self.endian + ('Q' if self.pointer_size == 8 else 'I')
+
+        self.blocks = []
+        self.blocks_by_address = {}
+        self.sdna = None
+        position = header_size
+        while position + block_header_size <= len(data):
+            values = dict(zip(block_header_fields, struct.unpack_from(block_header_format, data, position)))
+            position += block_header_size
+            code = values['code']
+            if code == b'ENDB':
+                break
+            block = Block(code, values['sdna_index'], values['address'], values['size'], values['count'], position)
+            if code == b'DNA1':
+                self.sdna = SDNA(data, position, self.pointer_size, self.endian)
+            else:
+                self.blocks.append(block)
+                self.blocks_by_address[block.address] = block
+            position += block.size
+
+        if self.sdna is None:
+            raise BlendFileError('No SDNA found in: ' + file_path)
+
+    def read_field(self, field, offset):
+        """Read the value of a field at an offset into the file."""
+        if field.is_pointer:
+            if field.array_size == 1:
+                return struct.unpack_from(self.pointer_format, self.data, offset)[0]
+            return list(struct.unpack_from(self.endian + str(field.array_size) + self.pointer_format[1], self.data, offset))
+
+        if field.type_name in ('char', 'uchar') and field.array_size > 1:
+            raw = self.data[offset:offset + field.array_size]
+            return raw.split(b'\0', 1)[0].decode('utf-8', 'replace')
+
+        primitive_format = _primitive_formats.get(field.type_name)
+        if primitive_format is not None:
+            values = struct.unpack_from(self.endian + str(field.array_size) + primitive_format, self.data, offset)
+            return values[0] if field.array_size == 1 else list(values)
+
+        dna_struct = self.sdna.structs_by_name.get(field.type_name)
+        if dna_struct is None:
+            return None
+        if field.array_size == 1:
+            return StructInstance(self, dna_struct, offset)
+        return [StructInstance(self, dna_struct, offset + i * dna_struct.size) for i in range(field.array_size)]
+
+    def block_struct(self, block):
+        return self.sdna.structs[block.sdna_index]
+
+    def instances(self, block):
+        """Returns the struct instances stored in a block."""
+        dna_struct = self.block_struct(block)
+        return [StructInstance(self, dna_struct, block.offset + i * dna_struct.size) for i in range(block.count)]
+
+    def dereference(self, address):
+        """Returns the first struct instance a pointer points to, or None."""
+        block = self.blocks_by_address.get(address) if address else None
+        if block is None or block.count == 0:
+            return None
+        return StructInstance(self, self.block_struct(block), block.offset)
+
+    def blocks_with_code(self, code):
+        code = code.encode('ascii').ljust(4, b'\0')
+        return [block for block in self.blocks if block.code == code]
+
+    def id_properties(self, instance):
+        """Returns the custom properties of an ID as nested dicts of integer values."""
+        return self._read_id_property_group(self.dereference(instance.get('id.properties', 0)))
+
+    def _read_id_property_group(self, group):
+        values = {}
+        if group is None:
+            return values
+        child = self.dereference(group.get('data.group.first', 0))
+        visited = set()
+        while child is not None and child.offset not in visited:
+            visited.add(child.offset)
+            child_type = child.get('type')
+            if child_type == IDP_GROUP:
+                values[child.get('name')] = self._read_id_property_group(child)
+            elif child_type in (IDP_INT, IDP_BOOLEAN):
+                values[child.get('name')] = child.get('data.val')
+            child = self.dereference(child.get('next', 0))
+        return values
+
+    def mesh_vertex_positions(self, mesh):
+        """Returns a list of the vertex positions of a Mesh struct instance."""
+        vertex_count = mesh.first_of(('verts_num', 'totvert'), 0)
+        if vertex_count <= 0:
+            return []
+
+        # older files store vertices as an array of MVert.
+        if mesh.has('mvert') and mesh.get('mvert'):
+            block = self.blocks_by_address.get(mesh.get('mvert'))
+            if block is not None:
+                mvert = self.block_struct(block)
+                co_field = mvert.fields['co']
+                return [tuple(struct.unpack_from(self.endian + '3f', self.data, block.offset + i * mvert.size + co_field.offset))
+                            for i in range(min(vertex_count, block.count))]
+
+        # newer files store them in a 'position' attribute.
+        vertex_data = mesh.get('vert_data') if mesh.has('vert_data') else mesh.get('vdata')
+        if vertex_data is None:
+            return []
+        layers_block = self.blocks_by_address.get(vertex_data.get('layers', 0))
+        if layers_block is None:
+            return []
+        for layer in self.instances(layers_block):
+            if layer.get('type') == CD_PROP_FLOAT3 and layer.get('name') == 'position':
+                block = self.blocks_by_address.get(layer.get('data', 0))
+                if block is None:
+                    return []
+                count = min(vertex_count, block.size // 12)
+                values = struct.unpack_from(self.endian + str(count * 3) + 'f', self.data, block.offset)
+                return [values[i:i + 3] for i in range(0, len(values), 3)]
+        return []
+
+
+def _bounds(positions):
+    if not positions:
+        return [[0, 0, 0], [0, 0, 0]]
+    return [[min(co[i] for co in positions) for i in range(3)], [max(co[i] for co in positions) for i in range(3)]]
+
+def read_insert_metadata(file_path):
+    """Read the metadata of an INSERT blend without bpy, in the same form as metadata.read_metadata."""
+    blend_file = BlendFile(file_path)
+
+    objects = [blend_file.instances(block)[0] for block in blend_file.blocks_with_code('OB') if block.count]
+    meshes_by_address = {block.address : blend_file.instances(block)[0] for block in blend_file.blocks_with_code('ME') if block.count}
+
+    kitops_properties = [blend_file.id_properties(obj).get('kitops', {}) for obj in objects]
+    main_objects = [obj for obj, properties in zip(objects, kitops_properties) if properties.get('main')] or \
+                    [obj for obj in objects if not obj.get('parent')]
+    main_object = main_objects[0] if main_objects else None
+
+    bounds = [[0, 0, 0], [0, 0, 0]]
+    if main_object is not None and main_object.get('type') == OB_MESH and main_object.get('data') in meshes_by_address:
+        bounds = _bounds(blend_file.mesh_vertex_positions(meshes_by_address[main_object.get('data')]))
+
+    mesh_objects = [obj for obj in objects if obj.get('type') == OB_MESH and obj.get('data') in meshes_by_address]
+    cutter_objects = [obj for obj, properties in zip(objects, kitops_properties) if properties.get('type', 0) == KITOPS_TYPE_CUTTER]
+    cutter_meshes = [meshes_by_address[obj.get('data')] for obj in cutter_objects if obj in mesh_objects]
+    return {
+        'bounds' : bounds,
+        'origin_offset' : [(bounds[0][i] + bounds[1][i]) / 2 for i in range(3)],
+        'vertex_count' : sum(meshes_by_address[obj.get('data')].first_of(('verts_num', 'totvert'), 0) for obj in mesh_objects),
+        'polygon_count' : sum(meshes_by_address[obj.get('data')].first_of(('faces_num', 'polys_num', 'totpoly'), 0) for obj in mesh_objects),
+        'cutter_count' : len(cutter_objects),
+        'cutter_polygon_count' : sum(mesh.first_of(('faces_num', 'polys_num', 'totpoly'), 0) for mesh in cutter_meshes),
+        # in a closed mesh every edge is used by exactly two faces.
+        'cutters_closed' : all(2 * mesh.first_of(('edges_num', 'totedge'), 0) == mesh.first_of(('corners_num', 'totloop'), 0) for mesh in cutter_meshes),
+        'material_count' : len(blend_file.blocks_with_code('MA')),
+    }
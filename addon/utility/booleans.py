@@ -0,0 +1,245 @@
+# Boolean modifier handling for layers: all cutters of a layer cutting the target through a single collection operand.
+import bpy
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from . import metadata
+
+_min_version = (2, 91, 0)
+
+# cutters with more polygons than this are cut with EXACT by the AUTO solver, as are cutters that are not closed.
+auto_fast_polygon_count = 500
+
+
+def is_supported():
+    """Whether this version of Blender has collection operands for boolean modifiers."""
+    return bpy.app.version >= _min_version
+
+def solver_for(layer, blend_path):
+    """Returns the solver for an INSERT of a layer, choosing one from the indexed cutter metadata for AUTO.
+
+    FAST is only chosen for closed, simple cutters; INSERTs that have not been indexed yet get EXACT to be safe."""
+    if layer.boolean_solver != 'AUTO':
+        return layer.boolean_solver
+    entry = metadata.get(blend_path)
+    if entry is None or 'cutter_polygon_count' not in entry:
+        return 'EXACT'
+    if entry['cutters_closed'] and entry['cutter_polygon_count'] <= auto_fast_polygon_count:
+        return 'FAST'
+    return 'EXACT'
+
+def layer_solver(layer):
+    """Returns the one solver to use where a whole layer is cut at once."""
+    if layer.boolean_solver != 'AUTO':
+        return layer.boolean_solver
+    for insert_entry in layer.inserts:
+        if insert_entry.is_enabled and solver_for(layer, metadata.blend_path(insert_entry)) == 'EXACT':
+            return 'EXACT'
+    return 'FAST'
+
+# the faces of a box made from the 8 corners of a bound_box.
+box_faces = np.array([[0, 1, 2, 3],
+                        [7, 6, 5, 4],
+                        [0, 4, 5, 1],
+                        [5, 6, 2, 1],
+                        [7, 4, 0, 3],
+                        [7, 3, 2, 6]], dtype=np.int32)
+
+def _hierarchy(insert_obj):
+    return [obj for obj in bpy.data.objects if obj.kitops.id == insert_obj.kitops.id]
+
+def layer_modifier(target_obj, layer):
+    """Returns the target's boolean modifier for the cutter collection of a layer, if it has one."""
+    for mod in target_obj.modifiers:
+        if mod.type == 'BOOLEAN' and getattr(mod, 'operand_type', 'OBJECT') == 'COLLECTION' and \
+                mod.collection is not None and mod.collection.get('kitopssynth_layer') == layer.name:
+            return mod
+    return None
+
+def _new_layer_modifier(target_obj, layer):
+    """Create the cutter collection of a layer and the modifier that cuts the target with it."""
+    name = 'SYNTH ' + layer.layer_name + ' Cutters'
+    collection = bpy.data.collections.new(name)
+    collection['kitopssynth_layer'] = layer.name
+    mod = target_obj.modifiers.new(name=name, type='BOOLEAN')
+    mod.operand_type = 'COLLECTION'
+    mod.collection = collection
+    mod.operation = 'DIFFERENCE'
+    mod.show_expanded = False
+    return mod
+
+def consolidate(target_obj, layer, insert_objs):
+    """Move the cutters of a layer's INSERTs from their own boolean modifiers into the layer's cutter collection."""
+    mod = layer_modifier(target_obj, layer)
+    solver = layer_solver(layer)
+    for insert_obj in insert_objs:
+        if insert_obj is None:
+            continue
+        for obj in _hierarchy(insert_obj):
+            if obj.kitops.type != 'CUTTER':
+                continue
+            own_mods = [m for m in target_obj.modifiers if m.type == 'BOOLEAN' and m.object == obj]
+            # only differences can be combined into one operand; other operations keep their own modifier.
+            if any(m.operation != 'DIFFERENCE' for m in own_mods):
+                continue
+            # cutters that do not touch the target stay out of the operand collection.
+            if not obj.kitopssynth_insert.cuts_target:
+                if mod is not None and obj.name in mod.collection.objects:
+                    mod.collection.objects.unlink(obj)
+                for m in own_mods:
+                    target_obj.modifiers.remove(m)
+                continue
+            if mod is None:
+                mod = _new_layer_modifier(target_obj, layer)
+            for m in own_mods:
+                target_obj.modifiers.remove(m)
+            if obj.name not in mod.collection.objects:
+                mod.collection.objects.link(obj)
+    if mod is not None:
+        mod.solver = solver
+
+def split(target_obj, layer):
+    """Give the cutters in a layer's cutter collection their own boolean modifiers again and remove the collection."""
+    mod = layer_modifier(target_obj, layer)
+    if mod is None:
+        return
+    collection = mod.collection
+    solver = mod.solver
+    for obj in collection.objects:
+        obj_mod = target_obj.modifiers.new(name=obj.name, type='BOOLEAN')
+        obj_mod.object = obj
+        obj_mod.operation = 'DIFFERENCE'
+        obj_mod.solver = solver
+        obj_mod.show_expanded = False
+    target_obj.modifiers.remove(mod)
+    bpy.data.collections.remove(collection)
+
+def sync_layer(target_obj, layer, insert_objs):
+    """Bring the boolean modifiers of a layer in line with its cutter collection option."""
+    if layer.use_cutter_collection and is_supported():
+        consolidate(target_obj, layer, insert_objs)
+    elif is_supported():
+        split(target_obj, layer)
+
+def remove_empty(target_obj):
+    """Remove layer cutter collections, and their modifiers, that no longer hold any cutters."""
+    for mod in list(target_obj.modifiers):
+        if mod.type == 'BOOLEAN' and getattr(mod, 'operand_type', 'OBJECT') == 'COLLECTION' and \
+                mod.collection is not None and 'kitopssynth_layer' in mod.collection and \
+                not len(mod.collection.objects):
+            collection = mod.collection
+            target_obj.modifiers.remove(mod)
+            bpy.data.collections.remove(collection)
+
+def _is_synth_modifier(mod):
+    """Whether a modifier is a boolean that cuts with SYNTH's INSERTs."""
+    if mod.type != 'BOOLEAN':
+        return False
+    if getattr(mod, 'operand_type', 'OBJECT') == 'COLLECTION':
+        return mod.collection is not None and 'kitopssynth_layer' in mod.collection
+    return mod.object is not None and mod.object.kitops.id != ''
+
+
+class DeferredBooleans():
+    """Keeps the boolean modifiers of a run disabled until it is finished, so the boolean stack is evaluated once.
+
+    Modifiers are remembered by name, as they may be removed while the run is still going."""
+
+    def __init__(self):
+        self.modifiers = []
+
+    def _defer(self, target_obj, mod):
+        if mod.show_viewport or mod.show_render:
+            self.modifiers.append((target_obj.name, mod.name, mod.show_viewport, mod.show_render))
+            mod.show_viewport = False
+            mod.show_render = False
+
+    def defer_target(self, target_obj):
+        """Disable all of SYNTH's boolean modifiers on a target."""
+        for mod in target_obj.modifiers:
+            if _is_synth_modifier(mod):
+                self._defer(target_obj, mod)
+
+    def defer(self, target_obj, objs):
+        """Disable the boolean modifiers of the target that cut with the given objects."""
+        for mod in target_obj.modifiers:
+            if mod.type == 'BOOLEAN' and mod.object in objs:
+                self._defer(target_obj, mod)
+
+    def set_enabled(self, target_obj, mod, enabled):
+        """Decide whether a deferred modifier is enabled when the run is finished."""
+        self.modifiers = [entry for entry in self.modifiers if entry[0] != target_obj.name or entry[1] != mod.name]
+        if enabled:
+            self.modifiers.append((target_obj.name, mod.name, True, True))
+
+    def apply(self):
+        """Enable all deferred modifiers in one step."""
+        for target_name, mod_name, show_viewport, show_render in self.modifiers:
+            target_obj = bpy.data.objects.get(target_name)
+            mod = target_obj.modifiers.get(mod_name) if target_obj is not None else None
+            if mod is not None:
+                mod.show_viewport = show_viewport
+                mod.show_render = show_render
+        self.modifiers.clear()
+
+
+class RelevanceCheck():
+    """Tests cutters against the target's mesh so that cutters that do not touch it get no boolean.
+
+    The BVH tree of each target is built once per run, from its original mesh in world space."""
+
+    def __init__(self):
+        self.trees = {}
+        self.irrelevant_count = 0
+
+    def _target(self, target_obj):
+        if target_obj.name not in self.trees:
+            me = target_obj.data
+            matrix = np.array(target_obj.matrix_world, dtype=np.float64)
+            cos = np.empty(len(me.vertices) * 3, dtype=np.float32)
+            me.vertices.foreach_get('co', cos)
+            cos = cos.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+            me.calc_loop_triangles()
+            triangles = np.empty(len(me.loop_triangles) * 3, dtype=np.int32)
+            me.loop_triangles.foreach_get('vertices', triangles)
+            tree = BVHTree.FromPolygons(cos.tolist(), triangles.reshape(-1, 3).tolist())
+            self.trees[target_obj.name] = (tree, cos[0] if len(cos) else None)
+        return self.trees[target_obj.name]
+
+    def touches(self, target_obj, cutter, matrix):
+        """Whether the bounds of a cutter, at the given world matrix, touch the target's surface or contain the whole target."""
+        tree, target_point = self._target(target_obj)
+        corners = [matrix @ Vector(co) for co in cutter.bound_box]
+        if tree.overlap(BVHTree.FromPolygons(corners, box_faces.tolist())):
+            return True
+        if target_point is None:
+            return False
+        # without crossing the surface, the box cuts something only if the target lies inside it.
+        local_point = np.array(matrix.inverted() @ Vector(target_point.tolist()))
+        bound_box = np.array(cutter.bound_box, dtype=np.float64)
+        return bool(np.all(local_point >= bound_box.min(axis=0)) and np.all(local_point <= bound_box.max(axis=0)))
+
+    def check(self, target_obj, objs, world_matrices, deferred_booleans=None):
+        """Turn the booleans of the cutters among the given objects on or off depending on whether they touch the target.
+
+        The cutters' world matrices are passed in, as matrix_world only follows their placed parents after an update."""
+        cutters = [obj for obj in objs if obj.kitops.type == 'CUTTER' and obj.type == 'MESH']
+        if not cutters:
+            return
+        modifiers = {}
+        for mod in target_obj.modifiers:
+            if mod.type == 'BOOLEAN' and mod.object is not None:
+                modifiers.setdefault(mod.object.name, []).append(mod)
+
+        for cutter in cutters:
+            cuts_target = self.touches(target_obj, cutter, world_matrices[cutter])
+            if cutter.kitopssynth_insert.cuts_target != cuts_target:
+                cutter.kitopssynth_insert.cuts_target = cuts_target
+            if not cuts_target:
+                self.irrelevant_count += 1
+            for mod in modifiers.get(cutter.name, []):
+                if deferred_booleans is not None:
+                    deferred_booleans.set_enabled(target_obj, mod, cuts_target)
+                elif mod.show_viewport != cuts_target:
+                    mod.show_viewport = cuts_target
+                    mod.show_render = cuts_target
@@ -0,0 +1,121 @@
+# Simplified levels of detail for cutters, so that EXACT booleans with small INSERTs only cut with the geometry that shows.
+import bpy
+import bmesh
+import hashlib
+import numpy as np
+from math import radians, log2, floor
+from . import metadata, preview, blend_cache
+
+# level 0 is the cutter itself; each further level dissolves faces that are flatter than its angle, such as bevels.
+_level_angles = (radians(5), radians(15), radians(30))
+
+
+def _source_key(me):
+    """Identifies a cutter mesh by a hash of its geometry, as placed cutters are renamed."""
+    cos = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', cos)
+    loops = np.empty(len(me.loops), dtype=np.int32)
+    me.loops.foreach_get('vertex_index', loops)
+    return hashlib.sha1(cos.tobytes() + loops.tobytes()).hexdigest()[:16]
+
+def _bmesh_arrays(bm):
+    bm.verts.index_update()
+    cos = np.array([v.co[:] for v in bm.verts], dtype=np.float64).reshape(-1, 3)
+    face_vertex_indices = np.array([v.index for f in bm.faces for v in f.verts], dtype=np.int32)
+    face_sizes = np.array([len(f.verts) for f in bm.faces], dtype=np.int32)
+    return cos, face_vertex_indices, face_sizes
+
+def _make_lods(blend_path):
+    """Build all levels of detail for the cutters of an INSERT blend, as named arrays."""
+    lods = {}
+    with metadata.linked_objects(blend_path) as (objs, main_obj):
+        for obj in objs:
+            if obj.kitops.type != 'CUTTER' or obj.type != 'MESH':
+                continue
+            source_key = _source_key(obj.data)
+            if source_key in lods:
+                continue
+            bm = bmesh.new()
+            try:
+                bm.from_mesh(obj.data)
+                levels = [_bmesh_arrays(bm)]
+                for angle in _level_angles:
+                    bmesh.ops.dissolve_limit(bm, angle_limit=angle, verts=bm.verts[:], edges=bm.edges[:])
+                    levels.append(_bmesh_arrays(bm))
+            finally:
+                bm.free()
+            lods[source_key] = levels
+    return _pack_lods(lods)
+
+def _pack_lods(lods):
+    """Flatten the levels of detail of a blend's cutters into named arrays."""
+    arrays = {'keys' : np.array(list(lods.keys()), dtype=str)}
+    for key_index, levels in enumerate(lods.values()):
+        for level, (cos, face_vertex_indices, face_sizes) in enumerate(levels):
+            prefix = '%d_%d_' % (key_index, level)
+            arrays[prefix + 'cos'] = cos
+            arrays[prefix + 'face_vertex_indices'] = face_vertex_indices
+            arrays[prefix + 'face_sizes'] = face_sizes
+    return arrays
+
+def _unpack_lods(arrays):
+    lods = {}
+    for key_index, key in enumerate(arrays['keys'].tolist()):
+        lods[key] = [tuple(arrays['%d_%d_%s' % (key_index, level, name)] for name in ('cos', 'face_vertex_indices', 'face_sizes'))
+                        for level in range(len(_level_angles) + 1)]
+    return lods
+
+# kept on disk next to the INSERT proxies.
+_lods = blend_cache.BlendFileCache('cutter_lods', 2, _make_lods, _unpack_lods)
+
+def get_lods(blend_path):
+    """Returns the cutter levels of detail of an INSERT blend, generating and saving them if there are no up to date ones on disk."""
+    return _lods.get(blend_path)
+
+def choose_level(size, lod_size):
+    """Full detail at the LOD size and above, one level less detail for each halving below it."""
+    if size <= 0 or size >= lod_size:
+        return 0
+    return min(len(_level_angles), floor(log2(lod_size / size)) + 1)
+
+def _lod_mesh(blend_path, source_key, level, arrays):
+    """Returns the shared mesh for a level of a cutter, creating it if needed."""
+    name = 'SYNTH LOD %s %s %d' % (hashlib.sha1(blend_path.encode('utf-8')).hexdigest()[:8], source_key, level)
+    me = bpy.data.meshes.get(name)
+    if me is None or me.get('kitopssynth_lod_source') != source_key:
+        me = bpy.data.meshes.new(name)
+        preview.write_mesh(me, *arrays)
+        me['kitopssynth_lod_source'] = source_key
+    return me
+
+def apply(objs, blend_path, lod_size=None, world_matrices=None):
+    """Give the cutters among a placed INSERT's objects the level of detail that matches their size in the world.
+
+    Without a LOD size, cutters that were simplified before get their full detail back."""
+    cutters = [obj for obj in objs if obj.kitops.type == 'CUTTER' and obj.type == 'MESH' and
+                    (lod_size is not None or 'kitopssynth_lod_source' in obj.data)]
+    if not cutters:
+        return
+    lods = get_lods(blend_path)
+    if not lods:
+        return
+    for cutter in cutters:
+        me = cutter.data
+        is_lod = 'kitopssynth_lod_source' in me
+        source_key = me['kitopssynth_lod_source'] if is_lod else _source_key(me)
+        if source_key not in lods:
+            continue
+
+        level = 0
+        if lod_size is not None:
+            bound_box = np.array(cutter.bound_box, dtype=np.float64)
+            size = np.max((bound_box.max(axis=0) - bound_box.min(axis=0)) * np.array(world_matrices[cutter].to_scale()))
+            level = choose_level(size, lod_size)
+        if level == 0 and not is_lod:
+            continue
+
+        lod_me = _lod_mesh(blend_path, source_key, level, lods[source_key][level])
+        if lod_me != me:
+            cutter.data = lod_me
+            if me.users == 0 and not is_lod:
+                bpy.data.meshes.remove(me)
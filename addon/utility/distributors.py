@@ -3,13 +3,14 @@
 from math import ceil, radians, degrees, sin, cos
 import hashlib
 from kitops.addon.utility import math
-from . import addon, randomness, inserts, messages
+from . import addon, randomness, inserts, messages, metadata
 import bmesh
 import bpy
 from bpy.props import *
 import numpy as np
 from mathutils import Vector, Matrix, geometry
 from copy import deepcopy as copy
+from collections import OrderedDict
 import sys
 import importlib
 
@@ -23,6 +24,7 @@ class AbstractDistributor:
         pass
 
     def distribute(self, prop=None, context=None, layer=None):
+        """Yield batches of laid out INSERT placements, e.g. per face group or row."""
         return []
 
     def draw(preference, layout):
@@ -37,7 +39,13 @@ class AbstractDistributor:
     def decode(self, parametersJSON, layer):
         pass
 
-def calc_dimensions(matrix_world, local_center, local_normal, all_verts, padding_percentage):
+def placements(insert_ids, matrix):
+    """Tag a batch of laid out INSERTs with the matrix they were placed against."""
+    for insert_obj in insert_ids:
+        insert_obj.convert_matrix = matrix
+    return insert_ids
+
+def calc_dimensions(matrix_world, local_center, local_normal, all_cos, padding_percentage):
     """Method for calculated all required dimensions for row/col.grid calculation."""
 
     # center face insert paterns to the middle of the face, and generate a quaternion that aligns the objects to the face normal.
@@ -60,7 +68,7 @@ def calc_dimensions(matrix_world, local_center, local_normal, all_verts, padding
     inverted_matrix = matrix.inverted()
 
     #calculate bounds of face when converted to same space as a grid would be.  This is to calculate the grid to be projected.
-    inverted_cos = [inverted_matrix @ (matrix_world @  v.co)  for v in all_verts]
+    inverted_cos = [inverted_matrix @ (matrix_world @  co)  for co in all_cos]
     inverted_x_cos = [co.x for co in inverted_cos]
     inverted_y_cos = [co.y for co in inverted_cos]
 
@@ -168,10 +176,7 @@ def calc_face_groups(f, potential_face_group):
     return potential_face_group
 
 def is_intersect_face_group(face_group, co):
-    for f in face_group:
-        if bmesh.geometry.intersect_face_point(f, co):
-            return True
-    return False
+    return face_group.intersect(co)
 
 def calc_face_group_center(face_group):
     face_center_totals = Vector((0,0,0))
@@ -335,11 +340,10 @@ def get_proportion_list(num_of_portions, rng, rng_extent):
 def get_edge_position(point_along_edges, ordered_edge_tuples):
     total_length_so_far = 0
     for edge_tuple in ordered_edge_tuples:
-        edge = edge_tuple[0]
-        vertA= edge_tuple[1]
-        vertB= edge_tuple[2]
+        coA = edge_tuple[0]
+        coB = edge_tuple[1]
 
-        edge_length = edge.calc_length()
+        edge_length = (coB - coA).length
 
         total_length_so_far+=edge_length
 
@@ -347,8 +351,8 @@ def get_edge_position(point_along_edges, ordered_edge_tuples):
             # this is the edge where the point is at.
             point_on_this_edge = point_along_edges - (total_length_so_far - edge_length)
             factor = point_on_this_edge / edge_length
-            position = vertA.co.lerp(vertB.co, factor)
-            return position, edge
+            position = coA.lerp(coB, factor)
+            return position, edge_tuple
         
 
     return None
@@ -419,6 +423,244 @@ def stretch_insert_to_bounds(insert_obj, bound_width, bound_height, insert_width
 _all_axes = [a for a in 'xyz']
 
 
+# ###
+# ### Geometry analysis cache.
+# ###
+class AnalysedGeometry():
+    """Base class for cached geometry that INSERTs are laid out against."""
+
+    def __init__(self, center, normal, cos):
+        self.center = center
+        self.normal = normal
+        self.cos = cos
+        self._dimensions = {}
+
+    def dimensions(self, matrix_world, padding_percentage):
+        """Cached equivalent of calc_dimensions for this piece of geometry."""
+        if padding_percentage not in self._dimensions:
+            self._dimensions[padding_percentage] = calc_dimensions(matrix_world, self.center, self.normal, self.cos, padding_percentage)
+        return tuple(d.copy() if hasattr(d, 'copy') else d for d in self._dimensions[padding_percentage])
+
+
+class FacePolygon():
+    """A face flattened along its normal so points can be tested against it."""
+
+    def __init__(self, face):
+        self.matrix = face.normal.to_track_quat('Z', 'Y').to_matrix().inverted()
+        cos = [v.co.copy() for v in face.verts]
+        flat_cos = [(self.matrix @ co).to_2d() for co in cos]
+        self.triangles = [(flat_cos[a], flat_cos[b], flat_cos[c]) for a, b, c in geometry.tessellate_polygon([cos])]
+
+    def intersect(self, co):
+        flat_co = (self.matrix @ co).to_2d()
+        for a, b, c in self.triangles:
+            if geometry.intersect_point_tri_2d(flat_co, a, b, c):
+                return True
+        return False
+
+
+class FaceGroup(AnalysedGeometry):
+    """A group of linked, selected faces."""
+
+    def __init__(self, face_group):
+        face_group_verts = list(set([v for f in face_group for v in f.verts]))
+        super().__init__(calc_face_group_center(face_group), calc_face_group_normal(face_group), [v.co.copy() for v in face_group_verts])
+        self.polygons = [FacePolygon(f) for f in face_group]
+
+    def intersect(self, co):
+        for polygon in self.polygons:
+            if polygon.intersect(co):
+                return True
+        return False
+
+
+class BoundaryLoop(AnalysedGeometry):
+    """An ordered loop of boundary edges around a face group."""
+
+    def __init__(self, edge_group, local_center, local_normal):
+        edge_group_verts = list(set([v for e in edge_group for v in e.verts]))
+        super().__init__(local_center, local_normal, [v.co.copy() for v in edge_group_verts])
+
+        def sort_edge(k):
+            av_point = ((k.verts[0].co  + k.verts[1].co) * 0.5) 
+            return  (av_point[0], av_point[1], av_point[2])
+        edge_group.sort(key=sort_edge  ) 
+        
+        first_vert = None
+        current_edge = edge_group[0]
+        verts = current_edge.verts
+        def verts_key(k):
+            point =   Vector((k.co.x, k.co.y, k.co.z))
+            return (point[0], point[1], point[2])
+        
+        verts = sorted(verts, key=verts_key) 
+        current_vert = verts[0]
+        ordered_edge_tuples = []
+        while(current_vert != first_vert):
+            
+            first_vert = verts[0]
+            next_vert = current_edge.other_vert(current_vert)
+
+            ordered_edge_tuples.append((current_vert.co.copy(), next_vert.co.copy()))
+
+            potential_next_edges = [e for e in next_vert.link_edges if e != current_edge]
+            if len(potential_next_edges) == 0:
+                break
+            next_edge =  potential_next_edges[0]
+
+            current_edge = next_edge
+            current_vert = next_vert
+
+        self.ordered_edge_tuples = ordered_edge_tuples
+
+        total_edges_length = 0
+        for e in edge_group:
+            total_edges_length += e.calc_length()
+        self.length = total_edges_length
+
+
+class Triangle(AnalysedGeometry):
+    """A triangle of the triangulated face selection."""
+
+    def __init__(self, face):
+        cos = [v.co.copy() for v in face.verts]
+        super().__init__(face.calc_center_median(), face.normal.copy(), cos)
+
+
+def find_boundary_loops(bm, edge_boundary_deviation):
+    """Finds the boundary edge loops of each group of selected faces, inset by the deviation."""
+
+    # gather up groups of selected faces, inset if necessary according to offset, and then traverse each loop of edges.
+    bmesh.ops.delete(bm, geom = [f for f in bm.faces if not f.select], context="FACES")
+
+    connected_face_groups = find_face_groups(bm)
+
+    face_groups = []
+    for connected_face_group in connected_face_groups:
+        result = bmesh.ops.split(bm, geom=connected_face_group)
+        face_group = []
+        for f in result['geom']:
+            if isinstance(f, bmesh.types.BMFace):
+                face_group.append(f)
+        face_group = sorted(face_group, key=lambda k: k.index) 
+        face_groups.append(face_group)
+
+    boundary_loops = []
+    for face_group in face_groups:
+        local_center = calc_face_group_center(face_group)
+        local_normal = calc_face_group_normal(face_group)
+
+        if edge_boundary_deviation != 0:
+            result = bmesh.ops.inset_region(bm, faces=face_group, thickness=edge_boundary_deviation, use_even_offset=True, use_boundary=True)
+            bmesh.ops.delete(bm, geom = result['faces'], context="FACES")
+
+        # delete everything but the edge boundaries
+        face_group_edges = []
+        for f in face_group:
+            if f.is_valid:
+                face_group_edges.extend(f.edges)
+
+        face_group_edges = list(set(face_group_edges))
+
+        non_edge_boundaries = [e for e in face_group_edges if e.is_boundary == False]
+        bmesh.ops.delete(bm, geom = non_edge_boundaries, context="EDGES_FACES")
+
+        for e in face_group_edges:
+            if e.is_valid:
+                e.tag = False
+                e.select=True
+        edges = [e for e in face_group_edges if e.is_valid]
+        edge_groups = find_edge_groups(edges)
+
+        for edge_group in edge_groups:
+            
+            for e in edge_group:
+                e.tag = False
+                e.select = True
+
+        # now we have the groups of edges, each (hopefully!) forming a loop
+        boundary_loops.append((local_center, local_normal, [BoundaryLoop(edge_group, local_center, local_normal) for edge_group in edge_groups if len(edge_group)]))
+
+    return boundary_loops
+
+
+class GeometryAnalysis():
+    """Topology analysis of a target object's face selection, computed on demand and shared by all layers."""
+
+    def __init__(self):
+        self._face_groups = None
+        self._boundary_loops = {}
+        self._triangles = None
+
+    def _analyse(self, target_obj, method, *args):
+        bm = bmesh.new()
+        try:
+            bm.from_mesh(target_obj.data)
+            return method(bm, *args)
+        finally:
+            bm.free()
+
+    def face_groups(self, target_obj):
+        """Groups of linked, selected faces."""
+        if self._face_groups is None:
+            self._face_groups = [FaceGroup(face_group) for face_group in self._analyse(target_obj, find_face_groups)]
+        return self._face_groups
+
+    def boundary_loops(self, target_obj, edge_boundary_deviation):
+        """(center, normal, loops) per face group, with the loops inset by the deviation."""
+        if edge_boundary_deviation not in self._boundary_loops:
+            self._boundary_loops[edge_boundary_deviation] = self._analyse(target_obj, find_boundary_loops, edge_boundary_deviation)
+        return self._boundary_loops[edge_boundary_deviation]
+
+    def triangles(self, target_obj):
+        """The selected faces, triangulated."""
+        if self._triangles is None:
+            def triangulate(bm):
+                result = bmesh.ops.triangulate(bm, faces=[f for f in bm.faces if f.select], quad_method='FIXED', ngon_method='EAR_CLIP')
+                return [Triangle(f) for f in result['faces']]
+            self._triangles = self._analyse(target_obj, triangulate)
+        return self._triangles
+
+
+def mesh_hash(me):
+    """Returns a hash of the vertices and topology of a mesh."""
+    cos = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', cos)
+    vertex_indices = np.empty(len(me.loops), dtype=np.int32)
+    me.loops.foreach_get('vertex_index', vertex_indices)
+    loop_totals = np.empty(len(me.polygons), dtype=np.int32)
+    me.polygons.foreach_get('loop_total', loop_totals)
+
+    mesh_sha = hashlib.sha1()
+    mesh_sha.update(cos.tobytes())
+    mesh_sha.update(vertex_indices.tobytes())
+    mesh_sha.update(loop_totals.tobytes())
+    return mesh_sha.hexdigest()
+
+def selection_hash(me):
+    """Returns a hash of the face selection of a mesh."""
+    selection = np.empty(len(me.polygons), dtype=bool)
+    me.polygons.foreach_get('select', selection)
+    return hashlib.sha1(np.flatnonzero(selection).astype(np.int32).tobytes()).hexdigest()
+
+
+_geometry_analysis_cache_size = 16
+_geometry_analysis_cache = OrderedDict()
+
+def get_geometry_analysis(target_obj):
+    """Get the geometry analysis for the target object, reusing a previous one if nothing has changed."""
+    me = target_obj.data
+    key = (mesh_hash(me), selection_hash(me), tuple(v for row in target_obj.matrix_world for v in row))
+    if key in _geometry_analysis_cache:
+        _geometry_analysis_cache.move_to_end(key)
+    else:
+        _geometry_analysis_cache[key] = GeometryAnalysis()
+        while len(_geometry_analysis_cache) > _geometry_analysis_cache_size:
+            _geometry_analysis_cache.popitem(last=False)
+    return _geometry_analysis_cache[key]
+
+
+
 # ###
 # ### New Distributors go below.
 # ###
@@ -428,9 +670,9 @@ class RowDistributor(AbstractDistributor):
     def distribution_name():
         return 'Rows'
 
-    def _get_dimension_calc(self, matrix_world, local_center, local_normal, face_group_verts, padding):
+    def _get_dimension_calc(self, face_group, matrix_world, padding):
         """"Calculate the inverted dimensions of the face group bounds."""
-        return calc_dimensions(matrix_world, local_center, local_normal, face_group_verts, padding)
+        return face_group.dimensions(matrix_world, padding)
 
     def _get_rows_preference(self, preference):
         """Get the preference used to control the rows."""
@@ -495,14 +737,12 @@ class RowDistributor(AbstractDistributor):
         rng = randomness.random_generator(context, layer)
 
         # entry.name = self.__class__.distribution_name() + " Layout"
-        
-        bm = bmesh.new()
 
         target_obj = context.scene.kitopssynth_target_obj
 
         insert_frame_cache = inserts.InsertFrameCache(prop, context, layer, target_obj)
 
-        insert_ids_to_return = []
+        no_of_placements = 0
         matrix = None
         try:
             preference_rows = self._get_rows_preference(preference)
@@ -512,16 +752,10 @@ class RowDistributor(AbstractDistributor):
                 no_of_rows = preference_rows - 1
 
             if no_of_rows == 0:
-                return []
-
-            me = target_obj.data
-            bm.from_mesh(me)
-
-            local_center = None
-            local_normal = None
+                return
 
             # First, get all groups of selected faces.  Then, iterate over each group and overlay a set of rows.
-            face_groups = find_face_groups(bm)
+            face_groups = get_geometry_analysis(target_obj).face_groups(target_obj)
             overall_insert_name_ignore_list = []
 
             #make an overall list to only permit 'use once' insert selections on certain rows.
@@ -543,19 +777,10 @@ class RowDistributor(AbstractDistributor):
           
             for face_group_index in range(len(face_groups)):
                 face_group = face_groups[face_group_index]
-                local_center = calc_face_group_center(face_group)
-                local_normal = calc_face_group_normal(face_group)
-                
-
-                face_group_verts = []
-                for f in face_group:
-                    face_group_verts.extend(f.verts)
-
-                face_group_verts = list(set(face_group_verts))
 
                 # Determine the inverted bounds and matrix for converting between this 'inverted' space 
                 # (that is, the flattened space where the grid lies) and the 'actual' space (essentially the world space where the INSERTs need to be.)
-                matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = self._get_dimension_calc(target_obj.matrix_world, local_center, local_normal, face_group_verts, preference.padding)
+                matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = self._get_dimension_calc(face_group, target_obj.matrix_world, preference.padding)
 
                 # set up horizontal and vertical vectors.
                 left_right_vector = self._get_left_right_vector(matrix)
@@ -895,16 +1120,16 @@ class RowDistributor(AbstractDistributor):
                     assign_post_scale(surviving_insert_ids, layer)
                     assign_rotation(surviving_insert_ids, layer)
 
-                    for surviving_insert_id in surviving_insert_ids:
-                        insert_ids_to_return.append(surviving_insert_id[0])
+                    # hand the finished row over so it can be materialized straight away.
+                    no_of_placements += len(surviving_insert_ids)
+                    yield placements([surviving_insert_id[0] for surviving_insert_id in surviving_insert_ids], matrix)
 
 
         finally:
-            bm.free()
             insert_frame_cache.clear()
 
         # if no inserts ended up being added, add some messages to suggest things to the user...
-        if len(insert_ids_to_return) == 0:
+        if no_of_placements == 0:
             # check if 'maintain aspect ratio' selected in all cases.
             active_inserts = [i for i in preference.inserts if i.is_enabled]
             aspect_ratio_always_on = len(active_inserts) > 0
@@ -914,8 +1139,6 @@ class RowDistributor(AbstractDistributor):
             if aspect_ratio_always_on:
                 messages.add_message(context, 'No INSERTs were added for layer \"' + preference.layer_name + '\" but the Maintain Aspect Ratio setting is on in all cases.  This might mean the INSERTs do not fit.  Check set up?')
 
-        
-        return [obj.to_object(prop, context, matrix) for obj in insert_ids_to_return]
 
 
     def draw(preference, layout):
@@ -979,8 +1202,8 @@ class ColDistributor(RowDistributor, AbstractDistributor):
     def distribution_name():
         return 'Cols'
 
-    def _get_dimension_calc(self, matrix_world, local_center, local_normal, face_group_verts, padding):
-        matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = calc_dimensions(matrix_world, local_center, local_normal, face_group_verts, padding)
+    def _get_dimension_calc(self, face_group, matrix_world, padding):
+        matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = face_group.dimensions(matrix_world, padding)
         return matrix, direction, inverted_face_dim_y, inverted_face_dim_x, inverted_y_min, inverted_y_max, inverted_x_min, inverted_x_max, padding
 
     def _get_rows_preference(self, preference):
@@ -1104,42 +1327,27 @@ class GridDistributor(AbstractDistributor):
 
         preference = layer
 
-        rng = randomness.random_generator(context, layer)
-
         target_obj = context.scene.kitopssynth_target_obj
 
         insert_frame_cache = inserts.InsertFrameCache(prop, context, layer, target_obj)
 
-        insert_ids_to_return = []
         matrix = None
 
         # Use a bmesh object temporarily create  points can be taken from it easily
-        bm = bmesh.new()
         bm_grids = bmesh.new()
         size_x_prop = bm_grids.verts.layers.float.new('size_x_prop')
         size_y_prop = bm_grids.verts.layers.float.new('size_y_prop')
         try:
-            me = target_obj.data
-            bm.from_mesh(me)
-
-            local_center = None
-            local_normal = None
-            face_groups = find_face_groups(bm)
+            face_groups = get_geometry_analysis(target_obj).face_groups(target_obj)
             insert_name_ignore_list = []
-            for face_group in face_groups:
-                local_center = calc_face_group_center(face_group)
-                local_normal = calc_face_group_normal(face_group)
-
-                face_group_verts = []
-                for f in face_group:
-                    face_group_verts.extend(f.verts)
+            for face_group_index, face_group in enumerate(face_groups):
+                insert_ids_to_return = []
+                face_group_rng = randomness.random_substream(context, layer, face_group_index)
 
-                face_group_verts = list(set(face_group_verts))
+                matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = face_group.dimensions(target_obj.matrix_world, preference.padding)
 
-                matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding = calc_dimensions(target_obj.matrix_world, local_center, local_normal, face_group_verts, preference.padding)
-
-                row_height_proportions = get_proportions(rng, preference.grid_rows, preference.grid_row_height_deviation, inverted_face_dim_y)
-                col_width_proportions = get_proportions(rng, preference.grid_cols, preference.grid_col_width_deviation, inverted_face_dim_x)
+                row_height_proportions = get_proportions(face_group_rng, preference.grid_rows, preference.grid_row_height_deviation, inverted_face_dim_y)
+                col_width_proportions = get_proportions(face_group_rng, preference.grid_cols, preference.grid_col_width_deviation, inverted_face_dim_x)
 
                 # # create the grid by selecting every odd position on the generated grid.
                 new_verts = []
@@ -1182,9 +1390,12 @@ class GridDistributor(AbstractDistributor):
                 no_grid_points = len(new_verts)
                 frequency = preference.frequency if preference.frequency <= 100 else 100
                 no_points_to_get = round(no_grid_points * frequency * 0.01)
-                for i in range(0, no_points_to_get):
-                    # get a point randomly. 
-                    v = rng.choice(new_verts)
+
+                # visit the points in a random order that does not depend on the frequency, so changing it only adds or removes points at the end.
+                point_order = face_group_rng.permutation(no_grid_points)
+                for point_index in point_order[:no_points_to_get]:
+                    v = new_verts[point_index]
+                    rng = randomness.random_substream(context, layer, face_group_index, int(point_index))
                     co = v.co                                       
                     if not v.is_boundary:
 
@@ -1313,18 +1524,14 @@ class GridDistributor(AbstractDistributor):
                             if insert_props.use_once:
                                 insert_name_ignore_list.append(insert_props.insert_name)
 
-                    # remove point from list so we don't get it again.
-                    new_verts.remove(v)
-
                 bmesh.ops.delete(bm_grids, geom=new_verts)
 
+                yield placements(insert_ids_to_return, matrix)
+
         finally:
-            bm.free()
             bm_grids.free()
             insert_frame_cache.clear()
 
-        return [obj.to_object(prop, context, matrix) for obj in insert_ids_to_return]
-
 
     def draw(preference, layout):
         col = layout.column()
@@ -1382,126 +1589,37 @@ class EdgeDistributor(AbstractDistributor):
 
         preference = layer
 
-        rng = randomness.random_generator(context, layer)
-
         target_obj = context.scene.kitopssynth_target_obj
 
         insert_frame_cache = inserts.InsertFrameCache(prop, context, layer, target_obj)
 
-        insert_ids_to_return = []
         matrix = None
 
-        # Use a bmesh object temporarily create  points can be taken from it easily
-        bm = bmesh.new()
         try:
-            me = target_obj.data
-            bm.from_mesh(me)
-
-            # gather up groups of selected faces, inset if necessary according to offset, and then traverse each loop of edges and place INSERTs randomly.
-            bmesh.ops.delete(bm, geom = [f for f in bm.faces if not f.select], context="FACES")
-
-            connected_face_groups = find_face_groups(bm)
-
-            face_groups = []
-            for connected_face_group in connected_face_groups:
-                result = bmesh.ops.split(bm, geom=connected_face_group)
-                face_group = []
-                for f in result['geom']:
-                    if isinstance(f, bmesh.types.BMFace):
-                        face_group.append(f)
-                face_group = sorted(face_group, key=lambda k: k.index) 
-                face_groups.append(face_group)
+            # gather up the (cached) loops of boundary edges around each group of selected faces, inset if necessary according to offset, and place INSERTs randomly along them.
+            boundary_loops_by_face_group = get_geometry_analysis(target_obj).boundary_loops(target_obj, preference.edge_boundary_deviation)
 
             insert_name_ignore_list = []
-            for face_group in face_groups:
-                local_center = calc_face_group_center(face_group)
-                local_normal = calc_face_group_normal(face_group)
-
-                if preference.edge_boundary_deviation != 0:
-                    result = bmesh.ops.inset_region(bm, faces=face_group, thickness=preference.edge_boundary_deviation, use_even_offset=True, use_boundary=True)
-                    bmesh.ops.delete(bm, geom = result['faces'], context="FACES")
-
-                # delete everything but the edge boundaries
-                face_group_edges = []
-                for f in face_group:
-                    if f.is_valid:
-                        face_group_edges.extend(f.edges)
-
-                face_group_edges = list(set(face_group_edges))
-
-                non_edge_boundaries = [e for e in face_group_edges if e.is_boundary == False]
-                bmesh.ops.delete(bm, geom = non_edge_boundaries, context="EDGES_FACES")
-
-                for e in face_group_edges:
-                    if e.is_valid:
-                        e.tag = False
-                        e.select=True
-                edges = [e for e in face_group_edges if e.is_valid]
-                edge_groups = find_edge_groups(edges)
-
-                for edge_group in edge_groups:
-                    
-                    for e in edge_group:
-                        e.tag = False
-                        e.select = True
+            for face_group_index, (local_center, local_normal, boundary_loops) in enumerate(boundary_loops_by_face_group):
 
                 # now we have the groups of edges, each (hopefully!) forming a loop
-                for edge_group in edge_groups:
-                    if len(edge_group) == 0:
-                        continue
-
-                    edge_group_verts = []
-                    for e in edge_group:
-                        edge_group_verts.extend(e.verts)
-
-                    edge_group_verts = list(set(edge_group_verts))
+                for loop_index, boundary_loop in enumerate(boundary_loops):
+                    rng = randomness.random_substream(context, layer, face_group_index, loop_index)
 
                     # get the inverted coordinates of the flattened face area to go around in...maybe we don't need this?
-                    matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding_redundant = calc_dimensions(target_obj.matrix_world, local_center, local_normal, edge_group_verts, preference.padding)
-
-
-                    def sort_edge(k):
-                        av_point = ((k.verts[0].co  + k.verts[1].co) * 0.5) 
-                        return  (av_point[0], av_point[1], av_point[2])
-                    edge_group.sort(key=sort_edge  ) 
-                    
-                    first_vert = None
-                    current_edge = edge_group[0]
-                    verts = current_edge.verts
-                    def verts_key(k):
-                        point =   Vector((k.co.x, k.co.y, k.co.z))
-                        return (point[0], point[1], point[2])
-                    
-                    verts = sorted(verts, key=verts_key) 
-                    current_vert = verts[0]
-                    ordered_edge_tuples = []
-                    while(current_vert != first_vert):
-                        
-                        first_vert = verts[0]
-                        next_vert = current_edge.other_vert(current_vert)
+                    matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding_redundant = boundary_loop.dimensions(target_obj.matrix_world, preference.padding)
 
-                        ordered_edge_tuples.append((current_edge, current_vert, next_vert))
-
-                        potential_next_edges = [e for e in next_vert.link_edges if e != current_edge]
-                        if len(potential_next_edges) == 0:
-                            break
-                        next_edge =  potential_next_edges[0]
+                    ordered_edge_tuples = boundary_loop.ordered_edge_tuples
+                    total_edges_length = boundary_loop.length
 
-                        current_edge = next_edge
-                        current_vert = next_vert
 
-
-                    total_edges_length = 0
-                    for e in edge_group:
-                        total_edges_length += e.calc_length()
-
-                    
-
-                    total_edges_length_cut = total_edges_length * preference.frequency * 0.01
+                    # lay out the whole loop and then thin it out by frequency, so changing the frequency only adds or removes INSERTs.
+                    # frequencies above 100% pack proportionally more INSERTs onto the loop instead, closing them up as before.
+                    filled_length = total_edges_length * max(1, preference.frequency * 0.01)
                     current_length_so_far = 0
                     insert_ids = []
                     total_inserts_width = 0
-                    while current_length_so_far <= total_edges_length_cut:
+                    while current_length_so_far <= filled_length:
                         # create an insert.
 
                         insert_obj, insert_props = inserts.add_random_insert(prop, context, layer, layer.inserts, insert_frame_cache, rng, insert_name_ignore_list)
@@ -1538,7 +1656,7 @@ class EdgeDistributor(AbstractDistributor):
                         insert_height = size.y if size.y >= size.x else size.x 
                         current_length_so_far += insert_width
                         
-                        if current_length_so_far < total_edges_length_cut:
+                        if current_length_so_far < filled_length:
 
                             total_inserts_width+=insert_width
                             
@@ -1556,6 +1674,8 @@ class EdgeDistributor(AbstractDistributor):
                     # shuffle the inserts to ensure randomness.
                     rng.shuffle(insert_ids)
 
+                    insert_ids_to_return = []
+
                     # now, find points distributed along the edge loop.
                     segment_lengths = []
                     # get a set of random proportions to assign.
@@ -1564,6 +1684,9 @@ class EdgeDistributor(AbstractDistributor):
                     remaining_width = total_edges_length - total_inserts_width
                     total_segment_lengths = 0
 
+                    # draw each INSERT's cut off up front so it does not depend on the frequency.
+                    frequency_cut_offs = rng.uniform(0, 100, len(insert_ids))
+
                     for i in range(len(insert_ids)):
                         proportion = proportion_list[i]
                         insert_props = insert_ids[i][1]
@@ -1581,8 +1704,8 @@ class EdgeDistributor(AbstractDistributor):
                         if preference.edge_limit_mode == 'NONE':
                             continue_to_add = True
                         elif preference.edge_limit_mode == 'X' or preference.edge_limit_mode == 'Y':
-                            current_edge_vec1 = ((matrix.inverted() @ current_edge.verts[1].co) - (matrix.inverted() @ current_edge.verts[0].co)).normalized()
-                            current_edge_vec2 = ((matrix.inverted() @ current_edge.verts[0].co) - (matrix.inverted() @ current_edge.verts[1].co)).normalized()
+                            current_edge_vec1 = ((matrix.inverted() @ current_edge[1]) - (matrix.inverted() @ current_edge[0])).normalized()
+                            current_edge_vec2 = ((matrix.inverted() @ current_edge[0]) - (matrix.inverted() @ current_edge[1])).normalized()
                             
                             direction = Vector((1,0,0)) if preference.edge_limit_mode == 'X' else Vector((0,1,0))
                             angle1 = degrees(direction.angle(current_edge_vec1))
@@ -1592,7 +1715,7 @@ class EdgeDistributor(AbstractDistributor):
 
                         total_segment_lengths += segment_length
 
-                        if continue_to_add:
+                        if continue_to_add and frequency_cut_offs[i] < preference.frequency:
 
                             insert_ids_to_return.append(insert_obj)
                             point_on_edges += (local_normal * preference.z_position)
@@ -1626,13 +1749,10 @@ class EdgeDistributor(AbstractDistributor):
                                     if insert_height > 0:
                                         setattr(insert_obj.scale, 'y', getattr(insert_obj.scale, 'y') * (segment_length / insert_height))
 
-
+                    yield placements(insert_ids_to_return, matrix)
 
         finally:
-            bm.free()
             insert_frame_cache.clear()
-        
-        return [obj.to_object(prop, context, matrix) for obj in insert_ids_to_return]
 
     def draw(preference, layout):
         col = layout.column()
@@ -1681,43 +1801,35 @@ class RandomDistributor(AbstractDistributor):
 
         preference = layer
 
-        rng = randomness.random_generator(context, layer)
-
         target_obj = context.scene.kitopssynth_target_obj
 
         insert_frame_cache = inserts.InsertFrameCache(prop, context, layer, target_obj)
 
-        insert_ids_to_return = []
         matrix = None
 
-        # Use a bmesh object temporarily create  points can be taken from it easily
-        bm = bmesh.new()
-
         try:
-            me = target_obj.data
-            bm.from_mesh(me)
-
             # collate a set of random points.
             num_points = preference.random_amount
 
             # triangulate to easily get points
-            result = bmesh.ops.triangulate(bm, faces=[f for f in bm.faces if f.select], quad_method='FIXED', ngon_method='EAR_CLIP')
+            triangles = get_geometry_analysis(target_obj).triangles(target_obj)
 
-            result_faces = result['faces']
-
-            if len(result_faces) == 0:
+            if len(triangles) == 0:
                 return
 
             insert_name_ignore_list = []
             for i in range(0, num_points):
+                # each point draws from its own stream so that changing the amount only adds or removes points at the end.
+                rng = randomness.random_substream(context, layer, i)
+
                 # randomly get a face and then a point on that face.
-                random_face_index = rng.choice(range(0, len(result_faces)))
-                random_face = result_faces[random_face_index]
-                if len(random_face.verts) >= 3:
-                    verts = random_face.verts
-                    random_point = randomness.point_on_triangle(verts[0].co, verts[1].co, verts[2].co, rng)
+                random_face_index = rng.choice(range(0, len(triangles)))
+                random_face = triangles[random_face_index]
+                if len(random_face.cos) >= 3:
+                    verts = random_face.cos
+                    random_point = randomness.point_on_triangle(verts[0], verts[1], verts[2], rng)
 
-                    matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding_redundant = calc_dimensions(target_obj.matrix_world, random_face.calc_center_median(), random_face.normal, random_face.verts, preference.padding)
+                    matrix, direction, inverted_face_dim_x, inverted_face_dim_y, inverted_x_min, inverted_x_max, inverted_y_min, inverted_y_max, padding_redundant = random_face.dimensions(target_obj.matrix_world, preference.padding)
 
                     # place the insert.
                     insert_obj, insert_props = inserts.add_random_insert(prop, context, layer, layer.inserts, insert_frame_cache, rng, insert_name_ignore_list)
@@ -1756,17 +1868,14 @@ class RandomDistributor(AbstractDistributor):
                     assign_post_scale([(insert_obj, insert_props)], layer)
                     assign_rotation([(insert_obj, insert_props)], layer)
 
-                    insert_ids_to_return.append(insert_obj)
-
                     if insert_props.use_once:
                         insert_name_ignore_list.append(insert_props.insert_name)
 
+                    yield placements([insert_obj], matrix)
+
         finally:
-            bm.free()
             insert_frame_cache.clear()
 
-        return [obj.to_object(prop, context, matrix) for obj in insert_ids_to_return]
-
 
     def draw(preference, layout):
         col = layout.column()
@@ -1795,6 +1904,8 @@ def is_complex(context):
 
     for layer in context.scene.kitopssynth.layers:
         # general check - check for any general parameters here.
+        if layer.is_enabled and any(insert_entry.is_enabled and metadata.is_heavy(insert_entry) for insert_entry in layer.inserts):
+            return True
 
         #distributor check - check any potential problems here...
         distribution_class_name = layer.distribution
@@ -58,6 +58,13 @@ class RecipeEncoder(json.JSONEncoder):
                                     'inserts' : _encode_inserts(layer.inserts),
                                     'distribution' : _encode_distribution(layer),
                                     'boolean_solver' : layer.boolean_solver,
+                                    'use_linked_data' : layer.use_linked_data,
+                                    'use_cutter_collection' : layer.use_cutter_collection,
+                                    'use_cutter_lod' : layer.use_cutter_lod,
+                                    'cutter_lod_size' : layer.cutter_lod_size,
+                                    'cull_size' : layer.cull_size,
+                                    'cull_mode' : layer.cull_mode,
+                                    'output_mode' : layer.output_mode,
 
                                 } for layer in kitopssynth.layers]
             return {
@@ -131,6 +138,13 @@ def decode_recipe(recipeJSON, context):
         layer.rotation_respect_borders  = layerJSON['rotation_respect_borders'] if 'rotation_respect_borders' in layerJSON else False
         layer.rotation_deviation        = layerJSON['rotation_deviation']
         layer.boolean_solver            = layerJSON['boolean_solver']
+        layer.use_linked_data           = layerJSON['use_linked_data'] if 'use_linked_data' in layerJSON else False
+        layer.output_mode               = layerJSON['output_mode'] if 'output_mode' in layerJSON else 'OBJECTS'
+        layer.use_cutter_collection     = layerJSON['use_cutter_collection'] if 'use_cutter_collection' in layerJSON else False
+        layer.use_cutter_lod            = layerJSON['use_cutter_lod'] if 'use_cutter_lod' in layerJSON else False
+        layer.cutter_lod_size           = layerJSON['cutter_lod_size'] if 'cutter_lod_size' in layerJSON else 0.1
+        layer.cull_size                 = layerJSON['cull_size'] if 'cull_size' in layerJSON else 0
+        layer.cull_mode                 = layerJSON['cull_mode'] if 'cull_mode' in layerJSON else 'NO_BOOLEANS'
         _decode_inserts(layerJSON['inserts'], layer)
         _decode_distribution(layerJSON['distribution'], layer)
 
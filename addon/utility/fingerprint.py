@@ -0,0 +1,67 @@
+# Fingerprinting of the effective inputs to a layer's layout.
+import hashlib
+import json
+from mathutils import Vector, Matrix, Color, Euler, Quaternion
+from . import distributors
+
+# layer and INSERT entry properties that are UI state only and do not affect the layout.
+_ignored_layer_properties = {'rna_type', 'name', 'layer_name', 'is_expanded', 'thumbnail_labels', 'inserts'}
+_ignored_insert_properties = {'rna_type', 'name', 'is_expanded', 'error_message', 'clear_error_message'}
+
+
+def _value(value):
+    """Convert a property value into something JSON serialisable."""
+    if isinstance(value, Matrix):
+        return [list(row) for row in value]
+    if isinstance(value, (Vector, Color, Euler, Quaternion, tuple, list)):
+        return list(value)
+    if isinstance(value, set):
+        return sorted(value)
+    if hasattr(value, 'bl_rna'):
+        return None
+    return value
+
+def _snapshot(property_group, ignored):
+    """Snapshot the values of a property group's properties."""
+    return {p.identifier : _value(getattr(property_group, p.identifier))
+                for p in property_group.bl_rna.properties if p.identifier not in ignored}
+
+def _hash(inputs):
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _layout_inputs(context, layer, target_obj, face_id_list):
+    """Returns the inputs that decide where a layer's INSERTs are placed."""
+    return {
+        'layer' : _snapshot(layer, _ignored_layer_properties),
+        'inserts' : [_snapshot(insert_entry, _ignored_insert_properties) for insert_entry in layer.inserts],
+        'seed' : context.scene.kitopssynth.seed,
+        'face_ids' : face_id_list,
+        'mesh' : distributors.mesh_hash(target_obj.data),
+        'matrix_world' : _value(target_obj.matrix_world)
+    }
+
+def layout_fingerprint(context, layer, target_obj, face_id_list):
+    """Returns a fingerprint of the placements of a layer, regardless of how they are output."""
+    return _hash(_layout_inputs(context, layer, target_obj, face_id_list))
+
+def layer_fingerprint(op, context, layer, target_obj, face_id_list):
+    """Returns a fingerprint of everything that the layout of a layer depends on."""
+    preference = context.scene.kitopssynth
+    inputs = _layout_inputs(context, layer, target_obj, face_id_list)
+    inputs.update({
+        'preview_mode' : preference.preview_mode,
+        'preview_type' : preference.preview_type,
+        'preview_color' : list(preference.preview_color),
+        'boolean_target' : op.boolean_target.name if op.boolean_target else None
+    })
+    return _hash(inputs)
+
+def is_materialized(layer_ref, fingerprint):
+    """Whether a registered layer was laid out from the same inputs and all of its INSERTs still exist."""
+    if not layer_ref.fingerprint or layer_ref.fingerprint != fingerprint:
+        return False
+    for insert_ref in layer_ref.inserts:
+        insert_obj = insert_ref.insert_obj
+        if insert_obj is None or not insert_obj.users_scene:
+            return False
+    return True
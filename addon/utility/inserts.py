@@ -1,13 +1,14 @@
 
 import bpy
 from kitops.addon.utility import addon as kitops_addon
-from kitops.addon.utility import insert, remove, id, regex
+from kitops.addon.utility import insert, remove
 import numpy as np
 import copy
-from . import addon, randomness
+from . import addon, randomness, booleans, cutter_lod
 from mathutils import Vector, Euler, Matrix, Quaternion
-import bmesh
-import os
+import re
+import json
+import zlib
 
 
 def cleanup(prop, context, clear=False):
@@ -19,9 +20,8 @@ def cleanup(prop, context, clear=False):
 
     insert.operator = None
 
-def set_display_type(uuid, display_type):
-    objects_to_set = [obj for obj in bpy.data.objects if obj.kitops.id == uuid]
-    for insert_obj in objects_to_set:
+def set_display_type(objs, display_type):
+    for insert_obj in objs:
         insert_obj.display_type = display_type
 
 
@@ -54,12 +54,12 @@ def add_random_insert(op, context, layer, inserts, insert_frame_cache, rng = np.
 
         category_name = random_insert.category
 
-        if bpy.app.version[1] > 90:
+        if bpy.app.version >= (2, 91, 0):
             kitops_preference = kitops_addon.preference()
             old_boolean_solver_ref = kitops_preference.boolean_solver
         try:
-            if bpy.app.version[1] > 90:
-                kitops_preference.boolean_solver = layer.boolean_solver
+            if bpy.app.version >= (2, 91, 0):
+                kitops_preference.boolean_solver = insert_frame_cache.layer_solver
 
             for index, category in enumerate(option.kpack.categories):
                 if category.name == category_name:
@@ -86,7 +86,7 @@ def add_random_insert(op, context, layer, inserts, insert_frame_cache, rng = np.
                                 # cleanup(op, context)
                                 return insert_obj, random_insert
         finally:
-            if bpy.app.version[1] > 90:
+            if bpy.app.version >= (2, 91, 0):
                 kitops_preference.boolean_solver = old_boolean_solver_ref
     
     return None, None
@@ -110,6 +110,31 @@ def purge_data_block(blockref):
         if block.users == 0:
             getattr(bpy.data, blockref).remove(block)
 
+def _delete_instancer(instancer_obj):
+    """Delete a layer's instancing point cloud along with its modifier, node group and INSERT collections."""
+    target_obj = instancer_obj.kitops.reserved_target
+    if target_obj is not None:
+        for mod in list(target_obj.modifiers):
+            if mod.type == 'NODES' and mod.name == instancer_obj.name:
+                node_group = mod.node_group
+                target_obj.modifiers.remove(mod)
+                if node_group is not None and node_group.users == 0:
+                    bpy.data.node_groups.remove(node_group)
+
+    for collection_ref in instancer_obj.kitopssynth_insert.instance_collections:
+        collection = collection_ref.collection
+        if collection is None:
+            continue
+        main_objs = {obj.kitops.id : obj for obj in collection.objects}
+        for main_obj in main_objs.values():
+            delete_hierarchy(main_obj)
+        bpy.data.collections.remove(collection)
+
+    me = instancer_obj.data
+    bpy.data.objects.remove(instancer_obj)
+    if me is not None and me.users == 0:
+        bpy.data.meshes.remove(me)
+
 def delete_hierarchy(obj_to_delete, target_obj=None):
     """Delete an object and it's hierarchy.""" #TODO move to helper class.
 
@@ -118,6 +143,10 @@ def delete_hierarchy(obj_to_delete, target_obj=None):
                 obj_to_delete.kitops.reserved_target != target_obj): 
         return
 
+    if obj_to_delete.kitopssynth_insert.is_instancer:
+        _delete_instancer(obj_to_delete)
+        return
+
     objects_to_delete = [obj for obj in bpy.data.objects if obj is not None and obj.kitops.id == obj_to_delete.kitops.id]
 
     for obj in objects_to_delete:
@@ -136,9 +165,27 @@ def delete_hierarchy(obj_to_delete, target_obj=None):
         obj.kitops['main_object'] = None
 
         try:
-            remove.object(obj, data=True)
+            # only remove the data if no linked duplicate still uses it.
+            remove.object(obj, data=obj.data is None or obj.data.users <= 1)
         except: pass     #TODO better error handling needed.
 
+    if target_obj is not None:
+        booleans.remove_empty(target_obj)
+
+
+def _remove_cutters(objs):
+    """Remove the cutters from an INSERT's objects, returning the objects that are left."""
+    kept_objs = []
+    for obj in objs:
+        if obj.kitops.type == 'CUTTER' and not obj.kitops.main:
+            try:
+                remove.object(obj, data=obj.data is None or obj.data.users <= 1)
+            except (ReferenceError, RuntimeError):
+                # the cutter or its data was removed already.
+                pass
+        else:
+            kept_objs.append(obj)
+    return kept_objs
 
 def purge_data_blocks():
     # do a rather aggressive purge.
@@ -162,24 +209,16 @@ class SynthObject():
         self.intended_size = None
         self.intended_rotation = None
 
-def _rotate_around_pivot(pivot_point, point_to_rotate, amount):
-    #point which will be rotated around the cursor
-    rot_mat = Matrix.Rotation(amount, 3, 'Z')
-    v_new = rot_mat @ (point_to_rotate - pivot_point) + pivot_point
-
-    return v_new
-
-
 def insert_add(op, context, boolean_solver):
 
-    if bpy.app.version[1] > 90:
+    if bpy.app.version >= (2, 91, 0):
         kitops_preference = kitops_addon.preference()
         old_boolean_solver_ref = kitops_preference.boolean_solver
 
     uid = ''
 
     try:
-        if bpy.app.version[1] > 90:
+        if bpy.app.version >= (2, 91, 0):
             kitops_preference.boolean_solver = boolean_solver
 
         uid = insert.add(op, context)
@@ -188,7 +227,7 @@ def insert_add(op, context, boolean_solver):
         report_message = 'Failed to load .blend file for INSERT.'
         op.report({'ERROR'}, report_message)
     finally:
-        if bpy.app.version[1] > 90:
+        if bpy.app.version >= (2, 91, 0):
             kitops_preference.boolean_solver = old_boolean_solver_ref
 
     return uid
@@ -208,111 +247,105 @@ class InsertFrame():
         self.hide_viewport = hide_viewport
         self.op_location = op_location
         self.boolean_solver = boolean_solver
+        self.convert_matrix = None
+        self.use_linked_data = False
+        self.without_booleans = False
 
         self.cache_location = self.location.copy()
         self.cache_scale = self.scale.copy()
         self.cache_matrix = self.matrix_world.copy()
         self.cache_euler = self.rotation_euler.copy()
 
-    def to_object(self, op, context, convert_matrix):
+    def to_object(self, op, context):
+        """Add the INSERT for this placement, returning its main object and all of its objects."""
         op.location = self.op_location
 
+        # culled placements are added without a boolean target, and lose their cutters below.
+        old_bool_target = op.boolean_target
+        if self.without_booleans:
+            op.boolean_target = None
+        try:
+            insert_library = getattr(op, 'insert_library', None)
+            if insert_library is not None:
+                insert_obj = insert_library.add(op, context, self.boolean_solver, self.use_linked_data)
+            else:
+                uid = insert_add(op, context, self.boolean_solver)
 
-        if context.scene.kitopssynth.preview_mode and context.scene.kitopssynth.preview_type == 'FAST':
-            #we're gonna draw something instead based on object bounding box....
-            kitops_preference = kitops_addon.preference()
-            basename = os.path.basename(op.location)
-            collection_name = regex.clean_name(basename[:-6].title(), use_re=kitops_preference.clean_datablock_names)
-            insert_name = collection_name + " Preview"
-
-            me = bpy.data.meshes.new(insert_name)
-            insert_obj = bpy.data.objects.new(insert_name, me)
-            insert_obj.kitopssynth_insert.is_preview_insert = True
-            insert_obj.kitops.id = id.uuid()
-
-
-            insert_obj.location = self.cache_location
-            insert_obj.matrix_world = self.cache_matrix
-            insert_obj.scale = self.cache_scale
-            insert_obj.rotation_euler = self.cache_euler
-            insert_obj.color = context.scene.kitopssynth.preview_color
-
-
-
-            bm = bmesh.new()
-
-            i = 0
-            for loc in self.bound_box:
-                # v = bm.verts.new(insert_obj.matrix_world.inverted() @ Vector(loc))
-                v = bm.verts.new(loc)
-                v.index = i
-                i+=1
-
-            bm.verts.ensure_lookup_table()
-
-            if len(bm.verts) == 8:
-                bm.faces.new([bm.verts[0], bm.verts[1], bm.verts[2], bm.verts[3]])
-                bm.faces.new([bm.verts[7], bm.verts[6], bm.verts[5], bm.verts[4]])
-                bm.faces.new([bm.verts[0], bm.verts[4], bm.verts[5], bm.verts[1]])
-                bm.faces.new([bm.verts[5], bm.verts[6], bm.verts[2], bm.verts[1]])
-                bm.faces.new([bm.verts[7], bm.verts[4], bm.verts[0], bm.verts[3]])
-                bm.faces.new([bm.verts[7], bm.verts[3], bm.verts[2], bm.verts[6]])
-
-            bm.to_mesh(me)
-            bm.free()
-
-            
-            if 'INSERTS' not in bpy.data.collections:
-                context.scene.collection.children.link(bpy.data.collections.new(name='INSERTS'))
-
-            collection_name = regex.clean_name(basename[:-6].title(), use_re=kitops_preference.clean_datablock_names)
-            if collection_name not in bpy.data.collections:
-                bpy.data.collections['INSERTS'].children.link(bpy.data.collections.new(name=collection_name))
-
-            bpy.data.collections[collection_name].objects.link(insert_obj)
+                insert_obj = get_insert(uid)
+        finally:
+            op.boolean_target = old_bool_target
 
-        else:
+        if insert_obj == None:
+            return None, []
 
-            uid = insert_add(op, context, self.boolean_solver)
+        objs = [obj for obj in bpy.data.objects if obj.kitops.id == insert_obj.kitops.id]
+        if self.without_booleans:
+            objs = _remove_cutters(objs)
 
-            insert_obj = get_insert(uid)
+        material_table = getattr(op, 'material_table', None)
+        if material_table is not None:
+            material_table.share(objs, self.op_location)
 
-            if insert_obj == None:
-                return None
+        deferred_booleans = getattr(op, 'deferred_booleans', None)
+        if deferred_booleans is not None and op.boolean_target is not None:
+            deferred_booleans.defer(op.boolean_target, objs)
 
+        # the transform and parenting are written by place_objects for the whole batch.
         insert_obj.kitopssynth_insert.is_preview_insert = context.scene.kitopssynth.preview_mode
-
-        # determine delta between central location and actual center.
-        origin = insert_obj.location
-        natural_center = 0.125 * sum((Vector(b) for b in insert_obj.bound_box), Vector())
-        natural_center = insert_obj.matrix_world @ natural_center
-        natural_center[2] = origin[2]
-        rotated_origin = _rotate_around_pivot(natural_center, origin, self.kitopssynth.intended_rotation)
-        local_vector = (rotated_origin - natural_center) * self.scale
-        mx_inv = convert_matrix.inverted()
-        mx_norm = mx_inv.transposed().to_3x3()
-        delta_vector = mx_norm @ local_vector
-
-        # assign the object's transform properties
-        point = self.location + delta_vector
-        insert_obj.hide_viewport = self.hide_viewport
-        insert_obj.location = point
-        insert_obj.matrix_world = self.matrix_world
-        insert_obj.matrix_world.translation = point
-        insert_obj.rotation_euler.rotate_axis("Z", self.kitopssynth.intended_rotation)
-        insert_obj.scale = self.scale
+        insert_obj.kitopssynth_insert.placement_key = self.placement_key(context)
 
         if context.scene.kitopssynth.preview_mode and context.scene.kitopssynth.preview_type == "WIREFRAME":
-            set_display_type(insert_obj.kitops.id, 'WIRE')
-
-        insert.parent_objects(insert_obj, context.scene.kitopssynth_target_obj)
+            set_display_type(objs, 'WIRE')
 
         cleanup(op, context)
 
+        return insert_obj, objs
+
+    def placement_key(self, context):
+        """Returns a key identifying which existing INSERT objects this placement could reuse."""
+        preference = context.scene.kitopssynth
+        preview_type = preference.preview_type if preference.preview_mode else ''
+        return '|'.join([self.op_location, self.boolean_solver, preview_type,
+                            'LINKED' if self.use_linked_data else '',
+                            'NO_BOOLEANS' if self.without_booleans else ''])
+
+    def calc_cached_matrix_world(self):
+        """Calculate the world matrix of the INSERT from the location and center it was measured with."""
+        return Matrix(calc_matrix_worlds([self])[0].tolist())
+
+    def update_object(self, insert_obj, context):
+        """Prepare an existing INSERT object for the same INSERT to be moved to this placement."""
+        if insert_obj.kitopssynth_insert.is_preview_insert:
+            insert_obj.color = context.scene.kitopssynth.preview_color
         return insert_obj
 
+    def to_data(self):
+        """Returns the measured frame as JSON serialisable data."""
+        return {
+            'bound_box' : [list(co) for co in self.bound_box],
+            'matrix_world' : [list(row) for row in self.cache_matrix],
+            'scale' : list(self.cache_scale),
+            'rotation_euler' : list(self.cache_euler),
+            'rotation_order' : self.cache_euler.order,
+            'location' : list(self.cache_location),
+            'hide_viewport' : self.hide_viewport
+        }
+
+    @staticmethod
+    def from_data(data, op_location, boolean_solver):
+        """Create a frame from data returned by to_data."""
+        return InsertFrame( [tuple(co) for co in data['bound_box']],
+                            Matrix(data['matrix_world']),
+                            Vector(data['scale']),
+                            Euler(data['rotation_euler'], data['rotation_order']),
+                            Vector(data['location']),
+                            data['hide_viewport'],
+                            op_location,
+                            boolean_solver
+                            )
+
     def __copy__(self):
-        return InsertFrame( self.bound_box[:], 
+        insert_frame = InsertFrame( self.bound_box[:], 
                             self.matrix_world.copy(), 
                             self.scale.copy(), 
                             self.rotation_euler.copy(), 
@@ -321,11 +354,299 @@ class InsertFrame():
                             self.op_location,
                             self.boolean_solver
                             )
+        insert_frame.use_linked_data = self.use_linked_data
+        insert_frame.without_booleans = self.without_booleans
+        return insert_frame
+
+    def to_plan_data(self, matrix_world=None):
+        """Returns the final placement as JSON serialisable data for a layer's stored plan."""
+        if matrix_world is None:
+            matrix_world = self.calc_cached_matrix_world()
+        return {
+            'matrix_world' : [list(row) for row in matrix_world],
+            'hide_viewport' : self.hide_viewport,
+            'op_location' : self.op_location,
+            'boolean_solver' : self.boolean_solver,
+            'use_linked_data' : self.use_linked_data,
+            'without_booleans' : self.without_booleans
+        }
+
+class PlannedInsert(InsertFrame):
+    """A placement read back from a layer's stored plan, with its world matrix already worked out."""
+
+    def __init__(self, planned_matrix, hide_viewport, op_location, boolean_solver, use_linked_data=False, without_booleans=False):
+        self.planned_matrix = planned_matrix
+        self.hide_viewport = hide_viewport
+        self.op_location = op_location
+        self.boolean_solver = boolean_solver
+        self.use_linked_data = use_linked_data
+        self.without_booleans = without_booleans
+
+    @staticmethod
+    def from_plan_data(data):
+        """Create a placement from data returned by to_plan_data."""
+        return PlannedInsert(Matrix(data['matrix_world']),
+                            data['hide_viewport'],
+                            data['op_location'],
+                            data['boolean_solver'],
+                            data['use_linked_data'],
+                            data['without_booleans'] if 'without_booleans' in data else False)
+
+    def calc_cached_matrix_world(self):
+        return self.planned_matrix.copy()
+
+def _calc_frame_matrices(insert_frames):
+    """Calculate the world matrices of measured frames, as an (n, 4, 4) array.
+
+    Each INSERT is rotated about the centre it was measured with, flattened onto its origin's height, and moved to its point."""
+    count = len(insert_frames)
+    bound_centers = np.array([np.mean(np.array(f.bound_box, dtype=np.float64), axis=0) for f in insert_frames]).reshape(count, 3)
+    cache_matrices = np.array([f.cache_matrix for f in insert_frames], dtype=np.float64).reshape(count, 4, 4)
+    origins = np.array([f.cache_location for f in insert_frames], dtype=np.float64).reshape(count, 3)
+    locations = np.array([f.location for f in insert_frames], dtype=np.float64).reshape(count, 3)
+    scales = np.array([f.scale for f in insert_frames], dtype=np.float64).reshape(count, 3)
+    angles = np.array([f.kitopssynth.intended_rotation for f in insert_frames], dtype=np.float64)
+    convert_matrices = np.array([f.convert_matrix for f in insert_frames], dtype=np.float64).reshape(count, 4, 4)
+    rotations = np.array([f.matrix_world.to_3x3() for f in insert_frames], dtype=np.float64).reshape(count, 3, 3)
+
+    natural_centers = np.einsum('nij,nj->ni', cache_matrices[:, :3, :3], bound_centers) + cache_matrices[:, :3, 3]
+    offsets = origins - natural_centers
+    offsets[:, 2] = 0
+
+    rotations_z = np.zeros((count, 3, 3))
+    rotations_z[:, 0, 0] = rotations_z[:, 1, 1] = np.cos(angles)
+    rotations_z[:, 1, 0] = np.sin(angles)
+    rotations_z[:, 0, 1] = -rotations_z[:, 1, 0]
+    rotations_z[:, 2, 2] = 1
+
+    local_vectors = np.einsum('nij,nj->ni', rotations_z, offsets) * scales
+    normal_matrices = np.linalg.inv(convert_matrices)[:, :3, :3].transpose(0, 2, 1)
+    points = locations + np.einsum('nij,nj->ni', normal_matrices, local_vectors)
+
+    # the rotation of the measured matrix without its scale, turned about its own Z axis.
+    rotations = rotations / np.linalg.norm(rotations, axis=1, keepdims=True)
+    rotations = rotations @ rotations_z
+
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = rotations * scales[:, np.newaxis, :]
+    matrices[:, :3, 3] = points
+    matrices[:, 3, 3] = 1
+    return matrices
+
+def cull_placements(layer, placements):
+    """Apply a layer's cull size to a batch of placements.
+
+    Returns the placements to add and the number of culled placements; with the No Booleans mode those are kept but marked."""
+    if layer.cull_size <= 0:
+        return placements, 0
+    kept, culled = [], 0
+    for placement in placements:
+        if isinstance(placement, PlannedInsert):
+            # plans were culled when they were laid out.
+            kept.append(placement)
+            continue
+        bound_box = np.array(placement.bound_box, dtype=np.float64)
+        size = np.max((bound_box.max(axis=0) - bound_box.min(axis=0)) * np.abs(np.array(placement.scale, dtype=np.float64)))
+        if size >= layer.cull_size:
+            kept.append(placement)
+            continue
+        culled += 1
+        if layer.cull_mode == 'NO_BOOLEANS':
+            placement.without_booleans = True
+            kept.append(placement)
+    return kept, culled
+
+def calc_matrix_worlds(placements):
+    """Calculate the world matrices of a batch of placements at once, as an (n, 4, 4) array."""
+    matrices = np.empty((len(placements), 4, 4))
+    frame_indices = []
+    for i, placement in enumerate(placements):
+        if isinstance(placement, PlannedInsert):
+            matrices[i] = np.array(placement.planned_matrix, dtype=np.float64)
+        else:
+            frame_indices.append(i)
+    if frame_indices:
+        matrices[frame_indices] = _calc_frame_matrices([placements[i] for i in frame_indices])
+    return matrices
+
+def place_objects(insert_objs, placements, target_obj):
+    """Parent a batch of INSERTs to the target and move them to their placements, writing each object once.
+
+    Returns the world matrices of the INSERTs' main objects."""
+    matrices = calc_matrix_worlds(placements)
+    target_inv = target_obj.matrix_world.inverted() if target_obj is not None else None
+    for insert_obj, placement, matrix in zip(insert_objs, placements, matrices):
+        if insert_obj.hide_viewport != placement.hide_viewport:
+            insert_obj.hide_viewport = placement.hide_viewport
+        if target_obj is None:
+            insert_obj.matrix_world = Matrix(matrix.tolist())
+            continue
+        # with the target's inverse as the parent inverse, the basis matrix is the world matrix.
+        if insert_obj.parent != target_obj:
+            insert_obj.parent = target_obj
+        insert_obj.matrix_parent_inverse = target_inv
+        insert_obj.matrix_basis = Matrix(matrix.tolist())
+    return matrices
+
+def hierarchy_matrices(objs, insert_obj, matrix):
+    """Work out the world matrices of an INSERT's objects from the world matrix of its main object.
+
+    matrix_world of the other objects only follows a moved main object after a depsgraph update, which is too slow to run per batch."""
+    matrices = {insert_obj : matrix}
+    def world_matrix(obj):
+        if obj not in matrices:
+            if obj.parent is None:
+                matrices[obj] = obj.matrix_world.copy()
+            else:
+                matrices[obj] = world_matrix(obj.parent) @ obj.matrix_parent_inverse @ obj.matrix_basis
+        return matrices[obj]
+    for obj in objs:
+        world_matrix(obj)
+    return matrices
+
+# the part of a name added by name_insert, and Blender's own duplicate suffix.
+_placement_name_re = re.compile(r'( [0-9a-z]{10}-[0-9]{4,})?(\.[0-9]{3,})?$')
+_max_name_length = 63
+
+def layer_name_stamp(layer, face_group_key):
+    """Returns a short stamp identifying a layer and its face group, for placement names."""
+    return '%s%04x' % (layer.name.replace('-', '')[:6], zlib.crc32(face_group_key.encode('utf-8')) & 0xffff)
+
+def _placement_name(name, suffix):
+    base = _placement_name_re.sub('', name, count=1)
+    return base[:_max_name_length - len(suffix)] + suffix
+
+def name_insert(objs, stamp, index):
+    """Give an INSERT's objects and their own data unique names from the layer stamp and placement index.
+
+    Without this every copy of an INSERT shares a base name, and Blender has to search ever longer for a free .NNN suffix."""
+    suffix = ' %s-%04d' % (stamp, index)
+    for obj in objs:
+        name = _placement_name(obj.name, suffix)
+        if obj.name != name:
+            obj.name = name
+        if obj.data is not None and obj.data.users == 1 and obj.data.library is None:
+            data_name = _placement_name(obj.data.name, suffix)
+            if obj.data.name != data_name:
+                obj.data.name = data_name
+
+class LayerMaterializer():
+    """Materializes a layer's placements, moving the layer's existing INSERTs into place where they can be reused."""
+
+    def __init__(self, existing_objs, name_stamp=None, cutter_lod_size=None):
+        self.reusable = {}
+        self.name_stamp = name_stamp
+        self.cutter_lod_size = cutter_lod_size
+        self.index = 0
+        for insert_obj in existing_objs:
+            if insert_obj is not None and insert_obj.users_scene:
+                self.reusable.setdefault(insert_obj.kitopssynth_insert.placement_key, []).append(insert_obj)
+
+        # the objects of each reusable INSERT, found in a single pass over the blend data.
+        self.hierarchies = {}
+        reusable_ids = {insert_obj.kitops.id for insert_objs in self.reusable.values() for insert_obj in insert_objs}
+        for obj in bpy.data.objects:
+            if obj.kitops.id in reusable_ids:
+                self.hierarchies.setdefault(obj.kitops.id, []).append(obj)
+
+    def materialize(self, op, context, placements):
+        """Create or reuse INSERT objects for a batch of placements as they arrive from a distributor."""
+        insert_objs = []
+        hierarchies = []
+        placed = []
+        reused = []
+        for placement in placements:
+            reusable_objs = self.reusable.get(placement.placement_key(context))
+            is_reused = bool(reusable_objs)
+            if is_reused:
+                insert_obj = placement.update_object(reusable_objs.pop(0), context)
+                objs = self.hierarchies.get(insert_obj.kitops.id, [insert_obj])
+            else:
+                insert_obj, objs = placement.to_object(op, context)
+            if insert_obj is not None:
+                insert_objs.append(insert_obj)
+                hierarchies.append(objs)
+                placed.append(placement)
+                reused.append(is_reused)
+
+        matrices = place_objects(insert_objs, placed, context.scene.kitopssynth_target_obj)
+        world_matrices = {}
+        for insert_obj, objs, matrix in zip(insert_objs, hierarchies, matrices):
+            world_matrices.update(hierarchy_matrices(objs, insert_obj, Matrix(matrix.tolist())))
+
+        relevance_check = getattr(op, 'relevance_check', None)
+        if relevance_check is not None and op.boolean_target is not None and insert_objs:
+            cutters = [obj for objs in hierarchies for obj in objs]
+            relevance_check.check(op.boolean_target, cutters, world_matrices, getattr(op, 'deferred_booleans', None))
+
+        # simplified cutters only pay off with the EXACT solver; reused INSERTs that no longer qualify get their full detail back.
+        uses_lod = [self.cutter_lod_size is not None and op.boolean_target is not None and
+                        placement.boolean_solver == 'EXACT' and not placement.without_booleans for placement in placed]
+        for objs, placement, is_lod_used, is_reused in zip(hierarchies, placed, uses_lod, reused):
+            if is_lod_used:
+                cutter_lod.apply(objs, placement.op_location, self.cutter_lod_size, world_matrices)
+            elif is_reused:
+                cutter_lod.apply(objs, placement.op_location)
+
+        for insert_obj, objs in zip(insert_objs, hierarchies):
+            if self.name_stamp is not None:
+                name_insert(objs, self.name_stamp, self.index)
+            self.index += 1
+            yield insert_obj
+
+    def remove_unused(self, target_obj):
+        """Delete existing INSERTs that no placement reused."""
+        removed = 0
+        for insert_objs in self.reusable.values():
+            for insert_obj in insert_objs:
+                if not insert_obj.kitopssynth_insert.is_preview_insert:
+                    delete_hierarchy(insert_obj, target_obj)
+                else:
+                    delete_hierarchy(insert_obj)
+                removed += 1
+        self.reusable.clear()
+        if removed:
+            purge_data_blocks()
+        return removed
+
+
+_frame_cache_file_name = 'insert_frames.json'
+_frame_cache_version = 1
+_persistent_frames = None
+
+def _load_persistent_frames():
+    """Load the measured INSERT frames saved by previous sessions."""
+    global _persistent_frames
+    if _persistent_frames is None:
+        _persistent_frames = {}
+        try:
+            with open(addon.config_path(_frame_cache_file_name), 'r') as cache_file:
+                cache_json = json.load(cache_file)
+            if cache_json.get('version') == _frame_cache_version:
+                _persistent_frames = cache_json['frames']
+        except (OSError, ValueError, KeyError):
+            pass
+    return _persistent_frames
+
+def _save_persistent_frames():
+    """Save the measured INSERT frames for later sessions."""
+    try:
+        with open(addon.config_path(_frame_cache_file_name), 'w') as cache_file:
+            json.dump({'version' : _frame_cache_version, 'frames' : _persistent_frames}, cache_file)
+    except OSError:
+        pass
+
 
 class InsertFrameCache():
 
     def __init__(self, op, context, layer, target_obj):
         self.insert_frames = {}
+        self.has_imported = False
+        self.use_linked_data = layer.use_linked_data
+        # looking up the solver goes through the metadata of every INSERT of the layer, so it is done once per layer.
+        self.layer_solver = booleans.layer_solver(layer)
+        persistent_frames = _load_persistent_frames()
+        is_modified = False
         option = addon.option()
         for insert_props in layer.inserts:
             if insert_props.is_enabled:
@@ -337,38 +658,62 @@ class InsertFrameCache():
                             for index, blend in enumerate(category_item.blends):
                                 if blend.name == insert_props.insert_name:
                                     op.location = blend.location
-                                    old_bool_target = op.boolean_target
-                                    op.boolean_target = None
 
-                                    # temporarily get insert for sizing purposes
-                                    uid = insert_add(op, context, layer.boolean_solver)
-
-                                    if uid is None or uid == '':
+                                    # use the frame measured in a previous run if the blend file has not changed since.
+                                    stamp = addon.file_stamp(op.location)
+                                    cache_entry = persistent_frames.get(op.location)
+                                    if stamp is not None and cache_entry is not None and \
+                                            cache_entry['mtime'] == stamp[0] and cache_entry['size'] == stamp[1]:
+                                        self.insert_frames[op.location] = InsertFrame.from_data(cache_entry['frame'], op.location, booleans.solver_for(layer, op.location))
                                         continue
 
-                                    op.boolean_target = old_bool_target
-                                    insert_obj = get_insert(uid)
-                                    if insert_obj != None:
-                                        cleanup(op, context)
-                                        insert_frame = InsertFrame(
-                                            [i[:]for i in insert_obj.bound_box[:]],
-                                            insert_obj.matrix_world.copy(),
-                                            insert_obj.scale.copy(),
-                                            insert_obj.rotation_euler.copy(),
-                                            insert_obj.location.copy(),
-                                            insert_obj.hide_viewport,
-                                            op.location,
-                                            layer.boolean_solver)
+                                    insert_frame = self._measure_insert(op, context, layer)
+                                    if insert_frame is not None:
                                         self.insert_frames[op.location] = insert_frame
-                                        delete_hierarchy(insert_obj)
+                                        if stamp is not None:
+                                            persistent_frames[op.location] = {'mtime' : stamp[0], 'size' : stamp[1], 'frame' : insert_frame.to_data()}
+                                            is_modified = True
+        if is_modified:
+            _save_persistent_frames()
+
+    def _measure_insert(self, op, context, layer):
+        """Temporarily add the INSERT to the scene to measure it."""
+        old_bool_target = op.boolean_target
+        op.boolean_target = None
+        try:
+            uid = insert_add(op, context, booleans.solver_for(layer, op.location))
+        finally:
+            op.boolean_target = old_bool_target
+        self.has_imported = True
+
+        if uid is None or uid == '':
+            return None
+
+        insert_obj = get_insert(uid)
+        if insert_obj is None:
+            return None
+
+        cleanup(op, context)
+        insert_frame = InsertFrame(
+            [i[:]for i in insert_obj.bound_box[:]],
+            insert_obj.matrix_world.copy(),
+            insert_obj.scale.copy(),
+            insert_obj.rotation_euler.copy(),
+            insert_obj.location.copy(),
+            insert_obj.hide_viewport,
+            op.location,
+            booleans.solver_for(layer, op.location))
+        delete_hierarchy(insert_obj)
+        return insert_frame
 
     def get_insert_frame(self, op):
         if op.location in self.insert_frames:
-            return copy.copy(self.insert_frames[op.location])
+            insert_frame = copy.copy(self.insert_frames[op.location])
+            insert_frame.use_linked_data = self.use_linked_data
+            return insert_frame
         return None
 
     def clear(self):
         self.insert_frames.clear()
-        purge_data_blocks()
-
-
+        if self.has_imported:
+            purge_data_blocks()
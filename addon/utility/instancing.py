@@ -0,0 +1,220 @@
+# Geometry Nodes output for layers: one point cloud and one modifier per layer instead of an object per INSERT.
+import bpy
+import numpy as np
+from mathutils import Matrix
+from kitops.addon.utility import id
+from . import inserts, booleans
+
+_min_version = (3, 2, 0)
+
+# the Mesh Boolean node calls the modifier's FAST solver FLOAT.
+_node_solvers = {'FAST' : 'FLOAT'}
+
+
+def is_supported():
+    """Whether this version of Blender has all the nodes the instancing output needs."""
+    return bpy.app.version >= _min_version
+
+
+def _new_group_socket(node_group, name, in_out):
+    """Add a geometry socket to a node group's interface."""
+    if hasattr(node_group, 'interface'):
+        node_group.interface.new_socket(name, in_out=in_out, socket_type='NodeSocketGeometry')
+    elif in_out == 'INPUT':
+        node_group.inputs.new('NodeSocketGeometry', name)
+    else:
+        node_group.outputs.new('NodeSocketGeometry', name)
+
+def _input(node, identifier):
+    """Get a node input by identifier or name, as they vary between node types and versions."""
+    for socket in node.inputs:
+        if socket.identifier == identifier:
+            return socket
+    return node.inputs[identifier]
+
+def _enabled_output(node):
+    """Get the output of a node that matches its current data type."""
+    for socket in node.outputs:
+        if socket.enabled:
+            return socket
+    return node.outputs[0]
+
+def _named_attribute(nodes, name, data_type):
+    node = nodes.new('GeometryNodeInputNamedAttribute')
+    node.data_type = data_type
+    _input(node, 'Name').default_value = name
+    return _enabled_output(node)
+
+
+class InstanceCollections():
+    """An INSERT added once and split into hidden collections of its solid objects and its cutters.
+
+    With without_booleans the cutters are kept out of the boolean, as for placements culled with the No Booleans mode."""
+
+    def __init__(self, op, context, boolean_solver, name, without_booleans=False):
+        self.main_obj = None
+        self.solids = None
+        self.cutters = None
+        self.without_booleans = without_booleans
+
+        old_bool_target = op.boolean_target
+        op.boolean_target = None
+        try:
+            uid = inserts.insert_add(op, context, boolean_solver)
+        finally:
+            op.boolean_target = old_bool_target
+        self.main_obj = inserts.get_insert(uid) if uid else None
+        if self.main_obj is None:
+            return
+
+        self.matrix_world = self.main_obj.matrix_world.copy()
+        self.solids = bpy.data.collections.new(name + ' Solids')
+        self.cutters = bpy.data.collections.new(name + ' Cutters')
+        for obj in [obj for obj in bpy.data.objects if obj.kitops.id == self.main_obj.kitops.id]:
+            for collection in list(obj.users_collection):
+                collection.objects.unlink(obj)
+            if obj.kitops.type == 'CUTTER':
+                self.cutters.objects.link(obj)
+            else:
+                self.solids.objects.link(obj)
+
+
+def _write_points(me, positions, rotations, scales, insert_indices):
+    """Write the point cloud for a layer with numpy."""
+    me.vertices.add(len(positions))
+    me.vertices.foreach_set('co', np.asarray(positions, dtype=np.float32).ravel())
+
+    attribute = me.attributes.new('insert_index', 'INT', 'POINT')
+    attribute.data.foreach_set('value', np.asarray(insert_indices, dtype=np.int32))
+    attribute = me.attributes.new('rotation', 'FLOAT_VECTOR', 'POINT')
+    attribute.data.foreach_set('vector', np.asarray(rotations, dtype=np.float32).ravel())
+    attribute = me.attributes.new('scale', 'FLOAT_VECTOR', 'POINT')
+    attribute.data.foreach_set('vector', np.asarray(scales, dtype=np.float32).ravel())
+    me.update()
+
+
+def _build_node_group(name, points_obj, instance_collections, boolean_solver):
+    """Build the node group that instances the INSERTs on the points and cuts the target with all cutters at once."""
+    node_group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    _new_group_socket(node_group, 'Geometry', 'INPUT')
+    _new_group_socket(node_group, 'Geometry', 'OUTPUT')
+    nodes = node_group.nodes
+    links = node_group.links
+
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+
+    points = nodes.new('GeometryNodeObjectInfo')
+    points.transform_space = 'ORIGINAL'
+    _input(points, 'Object').default_value = points_obj
+
+    insert_index = _named_attribute(nodes, 'insert_index', 'INT')
+    rotation = _named_attribute(nodes, 'rotation', 'FLOAT_VECTOR')
+    scale = _named_attribute(nodes, 'scale', 'FLOAT_VECTOR')
+
+    join_solids = nodes.new('GeometryNodeJoinGeometry')
+    join_cutters = nodes.new('GeometryNodeJoinGeometry')
+
+    for index, collections in enumerate(instance_collections):
+        compare = nodes.new('FunctionNodeCompare')
+        compare.data_type = 'INT'
+        compare.operation = 'EQUAL'
+        links.new(insert_index, _input(compare, 'A_INT'))
+        _input(compare, 'B_INT').default_value = index
+
+        for collection, join in ((collections.solids, join_solids), (collections.cutters, join_cutters)):
+            if not len(collection.all_objects) or (collection == collections.cutters and collections.without_booleans):
+                continue
+            collection_info = nodes.new('GeometryNodeCollectionInfo')
+            collection_info.transform_space = 'ORIGINAL'
+            _input(collection_info, 'Collection').default_value = collection
+
+            instance_on_points = nodes.new('GeometryNodeInstanceOnPoints')
+            links.new(points.outputs['Geometry'], _input(instance_on_points, 'Points'))
+            links.new(compare.outputs[0], _input(instance_on_points, 'Selection'))
+            links.new(collection_info.outputs[0], _input(instance_on_points, 'Instance'))
+            links.new(rotation, _input(instance_on_points, 'Rotation'))
+            links.new(scale, _input(instance_on_points, 'Scale'))
+            links.new(instance_on_points.outputs[0], join.inputs[0])
+
+    realize_cutters = nodes.new('GeometryNodeRealizeInstances')
+    links.new(join_cutters.outputs[0], realize_cutters.inputs[0])
+
+    mesh_boolean = nodes.new('GeometryNodeMeshBoolean')
+    mesh_boolean.operation = 'DIFFERENCE'
+    if hasattr(mesh_boolean, 'solver'):
+        mesh_boolean.solver = _node_solvers.get(boolean_solver, boolean_solver)
+    links.new(group_input.outputs[0], _input(mesh_boolean, 'Mesh 1'))
+    links.new(realize_cutters.outputs[0], _input(mesh_boolean, 'Mesh 2'))
+
+    realize_solids = nodes.new('GeometryNodeRealizeInstances')
+    links.new(join_solids.outputs[0], realize_solids.inputs[0])
+
+    join_output = nodes.new('GeometryNodeJoinGeometry')
+    links.new(mesh_boolean.outputs[0], join_output.inputs[0])
+    links.new(realize_solids.outputs[0], join_output.inputs[0])
+    links.new(join_output.outputs[0], group_output.inputs[0])
+
+    return node_group
+
+
+def build_layer_instances(op, context, layer, target_obj, insert_frames):
+    """Turn a layer's placements into a point cloud object instanced onto the target by a Geometry Nodes modifier.
+
+    Returns the point cloud object, which stands in for the layer's INSERTs."""
+    instance_collections = []
+    collections_by_location = {}
+    positions, rotations, scales, insert_indices = [], [], [], []
+    target_inv = target_obj.matrix_world.inverted()
+
+    matrices = inserts.calc_matrix_worlds(insert_frames)
+    for insert_frame, matrix in zip(insert_frames, matrices):
+        key = (insert_frame.op_location, insert_frame.without_booleans)
+        if key not in collections_by_location:
+            op.location = insert_frame.op_location
+            collections = InstanceCollections(op, context, booleans.layer_solver(layer), 'SYNTH ' + layer.layer_name + ' ' + str(len(instance_collections)),
+                                                insert_frame.without_booleans)
+            if collections.main_obj is None:
+                continue
+            collections_by_location[key] = len(instance_collections)
+            instance_collections.append(collections)
+        index = collections_by_location[key]
+
+        # transform the INSERT from where it was added to the placement, relative to the target.
+        instance_matrix = target_inv @ Matrix(matrix.tolist()) @ instance_collections[index].matrix_world.inverted()
+        location, rotation, scale = instance_matrix.decompose()
+        positions.append(location[:])
+        rotations.append(rotation.to_euler()[:])
+        scales.append(scale[:])
+        insert_indices.append(index)
+
+    if not positions:
+        for collections in instance_collections:
+            inserts.delete_hierarchy(collections.main_obj)
+            bpy.data.collections.remove(collections.solids)
+            bpy.data.collections.remove(collections.cutters)
+        return None
+
+    name = 'SYNTH ' + layer.layer_name + ' Instances'
+    me = bpy.data.meshes.new(name)
+    _write_points(me, positions, rotations, scales, insert_indices)
+    points_obj = bpy.data.objects.new(name, me)
+    if 'INSERTS' not in bpy.data.collections:
+        context.scene.collection.children.link(bpy.data.collections.new(name='INSERTS'))
+    bpy.data.collections['INSERTS'].objects.link(points_obj)
+    points_obj.hide_viewport = True
+    points_obj.hide_render = True
+
+    # register it so it is cleared and deleted like an INSERT.
+    points_obj.kitops.id = id.uuid()
+    points_obj.kitops['reserved_target'] = target_obj
+    points_obj.kitopssynth_insert.is_instancer = True
+    for collections in instance_collections:
+        points_obj.kitopssynth_insert.instance_collections.add().collection = collections.solids
+        points_obj.kitopssynth_insert.instance_collections.add().collection = collections.cutters
+
+    mod = target_obj.modifiers.new(name=points_obj.name, type='NODES')
+    mod.node_group = _build_node_group(points_obj.name, points_obj, instance_collections, booleans.layer_solver(layer))
+    mod.show_expanded = False
+
+    return points_obj
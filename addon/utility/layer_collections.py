@@ -0,0 +1,110 @@
+# A collection per SYNTH layer, with child collections per kind of object, so layers and object kinds are shown or hidden with one toggle.
+import bpy
+from kitops.addon.utility import addon as kitops_addon
+from . import booleans
+
+# the child collections of a layer collection, by KIT OPS object type.
+_display_types = ('SOLID', 'CUTTER', 'WIRE')
+_display_names = {'SOLID' : 'Solids', 'CUTTER' : 'Cutters', 'WIRE' : 'Wires'}
+
+
+def get(layer):
+    """Returns the collection of a layer, if it has one."""
+    if 'INSERTS' not in bpy.data.collections:
+        return None
+    for collection in bpy.data.collections['INSERTS'].children:
+        if collection.get('kitopssynth_layer_collection') == layer.name:
+            return collection
+    return None
+
+def _child(collection, display_type):
+    for child in collection.children:
+        if child.get('kitopssynth_display') == display_type:
+            return child
+    return None
+
+def ensure(context, layer):
+    """Returns the collection of a layer, creating it and its child collections if needed."""
+    if 'INSERTS' not in bpy.data.collections:
+        context.scene.collection.children.link(bpy.data.collections.new(name='INSERTS'))
+    collection = get(layer)
+    if collection is None:
+        collection = bpy.data.collections.new('SYNTH ' + layer.layer_name)
+        collection['kitopssynth_layer_collection'] = layer.name
+        bpy.data.collections['INSERTS'].children.link(collection)
+        collection.hide_viewport = not layer.is_enabled
+        collection.hide_render = not layer.is_enabled
+    for display_type in _display_types:
+        if _child(collection, display_type) is None:
+            child = bpy.data.collections.new(collection.name + ' ' + _display_names[display_type])
+            child['kitopssynth_display'] = display_type
+            collection.children.link(child)
+    return collection
+
+def assign(context, layer, insert_objs):
+    """Move the objects of a layer's INSERTs into the layer's child collections."""
+    insert_ids = {insert_obj.kitops.id for insert_obj in insert_objs if insert_obj is not None}
+    if not insert_ids:
+        return
+    collection = ensure(context, layer)
+    children = {display_type : _child(collection, display_type) for display_type in _display_types}
+
+    for obj in bpy.data.objects:
+        if obj.kitops.id not in insert_ids:
+            continue
+        child = children.get(obj.kitops.type, children['SOLID'])
+        if obj.users_collection == (child,):
+            continue
+        if obj.name not in child.objects:
+            child.objects.link(obj)
+        # keep the object in the operand collections of layer booleans.
+        for user_collection in obj.users_collection:
+            if user_collection != child and 'kitopssynth_layer' not in user_collection:
+                user_collection.objects.unlink(obj)
+    apply_display(collection)
+
+def set_visible(layer, visible):
+    """Show or hide all objects of a layer, turning the booleans of its cutters on or off with them."""
+    collection = get(layer)
+    if collection is None:
+        return
+    if collection.hide_viewport == visible:
+        collection.hide_viewport = not visible
+    if collection.hide_render == visible:
+        collection.hide_render = not visible
+
+    cutters = {obj for obj in collection.all_objects if obj.kitops.type == 'CUTTER'}
+    targets = {obj.kitops.reserved_target for obj in cutters if obj.kitops.reserved_target is not None}
+    for target_obj in targets:
+        layer_mod = booleans.layer_modifier(target_obj, layer)
+        for mod in target_obj.modifiers:
+            if mod == layer_mod:
+                enabled = visible
+            elif mod.type == 'BOOLEAN' and mod.object in cutters:
+                # cutters that do not touch the target stay without a boolean.
+                enabled = visible and mod.object.kitopssynth_insert.cuts_target
+            else:
+                continue
+            if mod.show_viewport != enabled:
+                mod.show_viewport = enabled
+                mod.show_render = enabled
+
+def apply_display(collection=None):
+    """Show or hide the child collections of layer collections as the KIT OPS display options say."""
+    option = kitops_addon.option()
+    shown = {
+        'SOLID' : option.show_solid_objects,
+        'CUTTER' : option.show_cutter_objects,
+        'WIRE' : option.show_wire_objects
+    }
+    if collection is not None:
+        collections = [collection]
+    elif 'INSERTS' in bpy.data.collections:
+        collections = [c for c in bpy.data.collections['INSERTS'].children if 'kitopssynth_layer_collection' in c]
+    else:
+        collections = []
+    for collection in collections:
+        for child in collection.children:
+            display_type = child.get('kitopssynth_display')
+            if display_type in shown and child.hide_viewport == shown[display_type]:
+                child.hide_viewport = not shown[display_type]
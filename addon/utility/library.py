@@ -0,0 +1,167 @@
+# Cache of INSERTs loaded once per run and copied for every further placement.
+import bpy
+import re
+from collections import OrderedDict
+from kitops.addon.utility import id
+from . import inserts
+
+_holding_collection_name = 'SYNTH Templates'
+_duplicate_suffix_re = re.compile(r'\.[0-9]{3,}$')
+
+
+def _modifier_settings(mod):
+    """Snapshot the settings of a modifier so it can be recreated for another object."""
+    return {p.identifier : getattr(mod, p.identifier) for p in mod.bl_rna.properties
+                if not p.is_readonly and p.identifier not in {'name', 'object', 'collection'}}
+
+def _is_removed(material):
+    """Whether a material has been removed from the blend data since it was looked up."""
+    try:
+        return material.name not in bpy.data.materials or bpy.data.materials[material.name] != material
+    except ReferenceError:
+        return True
+
+
+class InsertTemplate():
+    """An INSERT loaded once through KIT OPS and kept out of the scene to copy from."""
+
+    def __init__(self, main_obj, boolean_target):
+        self.main_obj = main_obj
+        self.objs = [obj for obj in bpy.data.objects if obj.kitops.id == main_obj.kitops.id]
+        self.collection_names = {obj.name : [collection.name for collection in obj.users_collection] for obj in self.objs}
+
+        # take over the boolean modifiers KIT OPS added to the target so they can be recreated for each copy.
+        self.modifier_settings = []
+        if boolean_target is not None:
+            for mod in list(boolean_target.modifiers):
+                if mod.type == 'BOOLEAN' and mod.object in self.objs:
+                    self.modifier_settings.append((mod.object.name, _modifier_settings(mod)))
+                    boolean_target.modifiers.remove(mod)
+
+    def hold(self, holding_collection):
+        """Move the template out of the scene."""
+        for obj in self.objs:
+            for collection in list(obj.users_collection):
+                collection.objects.unlink(obj)
+            holding_collection.objects.link(obj)
+
+    def copy(self, boolean_target, use_linked_data=False):
+        """Create a new INSERT from the template, as KIT OPS would have added it.
+
+        With use_linked_data the copies share the template's object data, i.e. they are linked duplicates."""
+        new_id = id.uuid()
+        copies = {}
+        for obj in self.objs:
+            obj_copy = obj.copy()
+            if obj.data is not None and not use_linked_data:
+                obj_copy.data = obj.data.copy()
+            obj_copy.kitops.id = new_id
+            for collection_name in self.collection_names[obj.name]:
+                if collection_name in bpy.data.collections:
+                    bpy.data.collections[collection_name].objects.link(obj_copy)
+            copies[obj] = obj_copy
+
+        # point references within the hierarchy at the copies.
+        for obj, obj_copy in copies.items():
+            if obj.parent in copies:
+                obj_copy.parent = copies[obj.parent]
+            if obj.kitops.main_object in copies:
+                obj_copy.kitops['main_object'] = copies[obj.kitops.main_object]
+            for mod in obj_copy.modifiers:
+                if getattr(mod, 'object', None) in copies:
+                    mod.object = copies[mod.object]
+
+        if boolean_target is not None:
+            copies_by_name = {obj.name : obj_copy for obj, obj_copy in copies.items()}
+            for obj_name, settings in self.modifier_settings:
+                cutter = copies_by_name[obj_name]
+                mod = boolean_target.modifiers.new(name=cutter.name, type='BOOLEAN')
+                for identifier, value in settings.items():
+                    try:
+                        setattr(mod, identifier, value)
+                    except (AttributeError, TypeError, ValueError):
+                        pass
+                mod.object = cutter
+
+        return copies[self.main_obj]
+
+    def remove(self):
+        inserts.delete_hierarchy(self.main_obj)
+
+
+class InsertLibrary():
+    """Loads each INSERT a run needs once and creates further placements of it as in-memory copies."""
+
+    def __init__(self, max_templates=32):
+        self.max_templates = max_templates
+        self.templates = OrderedDict()
+
+    def _holding_collection(self):
+        if _holding_collection_name not in bpy.data.collections:
+            bpy.data.collections.new(_holding_collection_name)
+        return bpy.data.collections[_holding_collection_name]
+
+    def add(self, op, context, boolean_solver, use_linked_data=False):
+        """Add an INSERT for op.location, returning its main object."""
+        key = (op.location, boolean_solver, op.boolean_target.name if op.boolean_target else '')
+        if key in self.templates:
+            self.templates.move_to_end(key)
+        else:
+            uid = inserts.insert_add(op, context, boolean_solver)
+            main_obj = inserts.get_insert(uid) if uid else None
+            if main_obj is None:
+                return None
+            template = InsertTemplate(main_obj, op.boolean_target)
+            template.hold(self._holding_collection())
+            self.templates[key] = template
+            while len(self.templates) > self.max_templates:
+                self.templates.popitem(last=False)[1].remove()
+
+        return self.templates[key].copy(op.boolean_target, use_linked_data)
+
+    def clear(self):
+        """Evict all templates."""
+        for template in self.templates.values():
+            template.remove()
+        self.templates.clear()
+        if _holding_collection_name in bpy.data.collections:
+            bpy.data.collections.remove(bpy.data.collections[_holding_collection_name])
+
+
+class MaterialTable():
+    """Remaps the materials of newly added INSERTs to one shared material per source blend and material name.
+
+    Materials are tagged with the blend they were appended from, so the ones added by earlier runs are shared as well."""
+
+    def __init__(self):
+        self.materials = {}
+        for material in bpy.data.materials:
+            source = material.get('kitopssynth_source')
+            # unused materials may be purged during the run, so only materials in use are shared.
+            if source and material.library is None and material.users:
+                self.materials.setdefault((source, _duplicate_suffix_re.sub('', material.name)), material)
+
+    def share(self, objs, blend_path):
+        """Point the material slots of an INSERT's objects at the shared materials, removing copies that are left unused."""
+        replaced = set()
+        for obj in objs:
+            for slot in obj.material_slots:
+                material = slot.material
+                # linked materials are shared through their library already.
+                if material is None or material.library is not None:
+                    continue
+                key = (blend_path, _duplicate_suffix_re.sub('', material.name))
+                shared = self.materials.get(key)
+                if shared is not None and _is_removed(shared):
+                    shared = None
+                if shared is None:
+                    shared = self.materials[key] = material
+                if shared is material:
+                    material['kitopssynth_source'] = blend_path
+                    continue
+                slot.material = shared
+                replaced.add(material)
+
+        for material in replaced:
+            if material.users == 0:
+                bpy.data.materials.remove(material)
@@ -0,0 +1,256 @@
+# Index of KPACK INSERT metadata, built in the background so INSERTs can be judged without importing them.
+import bpy
+import os
+import json
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from . import addon, blendfile, messages
+
+_index_file_name = 'kpack_index.json'
+_index_version = 3
+_index = None
+# bumped whenever the index or the KPACKs change, so that lookups cached for drawing know when to look again.
+_index_generation = 0
+_drawn_metadata = {}
+
+# INSERTs are read by a pool of worker threads with the .blend reader, and collected by a timer on the main thread.
+# Blends the reader cannot handle are linked with bpy instead, in small batches so that the UI stays responsive.
+_index_interval = 0.1
+_index_time_budget = 0.05
+# how long to wait for KIT OPS to load the KPACKs before looking again.
+_kpack_wait_interval = 5
+_max_workers = min(8, os.cpu_count() or 1)
+_executor = None
+_futures = None
+_fallback_blend_paths = []
+# blends that could not be indexed either way, skipped for the rest of the session.
+_failed_blend_paths = set()
+
+# polygon count above which an INSERT is considered heavy for the complexity check.
+heavy_polygon_count = 100000
+
+
+def _load_index():
+    """Load the index saved by previous sessions."""
+    global _index
+    if _index is None:
+        _index = {}
+        try:
+            with open(addon.config_path(_index_file_name), 'r') as index_file:
+                index_json = json.load(index_file)
+            if index_json.get('version') == _index_version:
+                _index = index_json['inserts']
+        except (OSError, ValueError, KeyError):
+            pass
+    return _index
+
+def _save_index():
+    try:
+        with open(addon.config_path(_index_file_name), 'w') as index_file:
+            json.dump({'version' : _index_version, 'inserts' : _index}, index_file)
+    except OSError:
+        pass
+
+def kpack_blend_paths():
+    """Returns the paths of all INSERT blends in the installed KPACKs."""
+    option = addon.option()
+    if not option:
+        return []
+    return [blend.location for category in option.kpack.categories for blend in category.blends]
+
+def blend_path(insert_entry):
+    """Returns the blend path for a layer's INSERT entry."""
+    option = addon.option()
+    if not option:
+        return None
+    for category in option.kpack.categories:
+        if category.name == insert_entry.category:
+            for blend in category.blends:
+                if blend.name == insert_entry.insert_name:
+                    return blend.location
+    return None
+
+def get(blend_path):
+    """Returns the indexed metadata for an INSERT blend, or None if it is not indexed or out of date."""
+    if blend_path is None:
+        return None
+    entry = _load_index().get(blend_path)
+    if entry is None or addon.file_stamp(blend_path) != (entry['mtime'], entry['file_size']):
+        return None
+    return entry
+
+def insert_metadata(insert_entry):
+    """Returns the indexed metadata for a layer's INSERT entry."""
+    return get(blend_path(insert_entry))
+
+def _index_changed():
+    global _index_generation
+    _index_generation += 1
+
+def drawn_insert_metadata(insert_entry):
+    """Returns the indexed metadata for a layer's INSERT entry for drawing, only looking it up again when the index has changed."""
+    key = (insert_entry.category, insert_entry.insert_name)
+    cached = _drawn_metadata.get(key)
+    if cached is None or cached[0] != _index_generation:
+        cached = _drawn_metadata[key] = (_index_generation, insert_metadata(insert_entry))
+    return cached[1]
+
+def is_heavy(insert_entry):
+    """Whether an INSERT entry is known to be expensive to add."""
+    entry = insert_metadata(insert_entry)
+    return entry is not None and entry['polygon_count'] > heavy_polygon_count
+
+def _mesh_bounds(obj):
+    """Returns the local bounds of a mesh object from its vertices."""
+    me = obj.data
+    cos = np.empty(len(me.vertices) * 3, dtype=np.float32)
+    me.vertices.foreach_get('co', cos)
+    cos = cos.reshape(-1, 3)
+    return cos.min(axis=0).tolist(), cos.max(axis=0).tolist()
+
+@contextmanager
+def linked_objects(blend_path):
+    """Temporarily link the objects of a blend, yielding them and the INSERT's main object."""
+    abs_path = os.path.normcase(bpy.path.abspath(blend_path))
+    was_linked = any(os.path.normcase(bpy.path.abspath(library.filepath)) == abs_path for library in bpy.data.libraries)
+    # objects linked from the blend before, which must be left in place if its library is kept.
+    linked_before = {obj for obj in bpy.data.objects if obj.library is not None} if was_linked else set()
+
+    with bpy.data.libraries.load(blend_path, link=True) as (data_from, data_to):
+        data_to.objects = data_from.objects
+
+    objs = [obj for obj in data_to.objects if obj is not None]
+    try:
+        main_objs = [obj for obj in objs if obj.kitops.main] or [obj for obj in objs if obj.parent is None]
+        yield objs, main_objs[0] if main_objs else None
+    finally:
+        libraries = {obj.library for obj in objs if obj.library is not None}
+        if not was_linked:
+            for library in libraries:
+                bpy.data.libraries.remove(library)
+        else:
+            new_objs = [obj for obj in objs if obj not in linked_before]
+            new_data = {obj.data for obj in new_objs if obj.data is not None}
+            bpy.data.batch_remove(new_objs)
+            bpy.data.batch_remove([data for data in new_data if data.users == 0])
+
+def read_metadata(blend_path):
+    """Read the metadata of an INSERT blend by temporarily linking its objects."""
+    with linked_objects(blend_path) as (objs, main_obj):
+        bounds = [[0, 0, 0], [0, 0, 0]]
+        if main_obj is not None and main_obj.type == 'MESH' and len(main_obj.data.vertices):
+            bounds = list(_mesh_bounds(main_obj))
+
+        materials = set()
+        for obj in objs:
+            for slot in obj.material_slots:
+                if slot.material is not None:
+                    materials.add(slot.material.name)
+
+        cutter_meshes = [obj.data for obj in objs if obj.kitops.type == 'CUTTER' and obj.type == 'MESH']
+        return {
+            'bounds' : bounds,
+            'origin_offset' : [(bounds[0][i] + bounds[1][i]) / 2 for i in range(3)],
+            'vertex_count' : sum(len(obj.data.vertices) for obj in objs if obj.type == 'MESH'),
+            'polygon_count' : sum(len(obj.data.polygons) for obj in objs if obj.type == 'MESH'),
+            'cutter_count' : len([obj for obj in objs if obj.kitops.type == 'CUTTER']),
+            'cutter_polygon_count' : sum(len(me.polygons) for me in cutter_meshes),
+            # in a closed mesh every edge is used by exactly two faces.
+            'cutters_closed' : all(2 * len(me.edges) == len(me.loops) for me in cutter_meshes),
+            'material_count' : len(materials),
+        }
+
+def index_blend(blend_path):
+    """Index a single INSERT blend with bpy."""
+    stamp = addon.file_stamp(blend_path)
+    if stamp is None:
+        return
+    entry = read_metadata(blend_path)
+    entry['mtime'], entry['file_size'] = stamp
+    _load_index()[blend_path] = entry
+    _index_changed()
+
+def _read_in_background(blend_path):
+    """Read a single INSERT blend without bpy, so it can run on a worker thread."""
+    stamp = addon.file_stamp(blend_path)
+    if stamp is None:
+        return None
+    entry = blendfile.read_insert_metadata(blend_path)
+    entry['mtime'], entry['file_size'] = stamp
+    return entry
+
+def _index_step():
+    """Timer callback that collects indexed INSERT blends."""
+    global _executor, _futures
+    if _futures is None:
+        option = addon.option()
+        if not option or not len(option.kpack.categories):
+            # without loaded KPACKs there is nothing to index, and the saved index must be left as it is.
+            return _kpack_wait_interval
+        blend_paths = kpack_blend_paths()
+        index = _load_index()
+        # only forget blends that are gone from disk; KPACKs that are not loaded right now may come back.
+        for stale_path in [path for path in index if addon.file_stamp(path) is None]:
+            del index[stale_path]
+            _index_changed()
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_max_workers)
+        _futures = {path : _executor.submit(_read_in_background, path) for path in blend_paths
+                        if get(path) is None and path not in _failed_blend_paths}
+
+    for path, future in list(_futures.items()):
+        if future.done():
+            del _futures[path]
+            try:
+                entry = future.result()
+                if entry is not None:
+                    _load_index()[path] = entry
+                    _index_changed()
+            except Exception:
+                _fallback_blend_paths.append(path)
+
+    start_time = time.time()
+    while _fallback_blend_paths and time.time() - start_time < _index_time_budget:
+        path = _fallback_blend_paths.pop()
+        try:
+            index_blend(path)
+        except Exception as e:
+            _failed_blend_paths.add(path)
+            if bpy.context.scene is not None:
+                messages.add_message(bpy.context, 'Could not read INSERT metadata from ' + path + ': ' + str(e))
+
+    if _futures or _fallback_blend_paths:
+        return _index_interval
+
+    _futures = None
+    _save_index()
+    return None
+
+def start_indexing(first_interval=0):
+    """Start indexing any new or changed INSERT blends in the background."""
+    global _futures
+    if _futures is not None:
+        for future in _futures.values():
+            future.cancel()
+    _futures = None
+    _fallback_blend_paths.clear()
+    _index_changed()
+    if not bpy.app.timers.is_registered(_index_step):
+        bpy.app.timers.register(_index_step, first_interval=first_interval)
+
+def is_indexing():
+    return bpy.app.timers.is_registered(_index_step)
+
+def stop_indexing():
+    global _executor, _futures
+    if bpy.app.timers.is_registered(_index_step):
+        bpy.app.timers.unregister(_index_step)
+    if _futures is not None:
+        for future in _futures.values():
+            future.cancel()
+    _futures = None
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,120 @@
+# Pool of a layer's INSERTs, parked outside the scene between redo cycles so they can be moved back into place instead of imported again.
+import bpy
+import json
+from bpy.app.handlers import persistent
+from . import inserts
+
+_pool_collection_name = 'SYNTH Pool'
+
+
+def _pool_collection():
+    """Returns the collection that holds parked INSERTs; it is not linked to any scene."""
+    if _pool_collection_name not in bpy.data.collections:
+        bpy.data.collections.new(_pool_collection_name)
+    return bpy.data.collections[_pool_collection_name]
+
+def _hierarchy(insert_obj):
+    return [obj for obj in bpy.data.objects if obj.kitops.id == insert_obj.kitops.id]
+
+def _park_booleans(target_obj, objs):
+    """Remove the target's boolean modifiers for an INSERT's cutters, remembering them on the cutters."""
+    if target_obj is None:
+        return
+    booleans = {}
+    for mod in list(target_obj.modifiers):
+        if mod.type == 'BOOLEAN' and mod.object in objs:
+            booleans.setdefault(mod.object.name, []).append({'name' : mod.name, 'operation' : mod.operation,
+                                                            'solver' : getattr(mod, 'solver', None)})
+            target_obj.modifiers.remove(mod)
+    for obj in objs:
+        obj.kitopssynth_insert.pooled_booleans = json.dumps(booleans[obj.name]) if obj.name in booleans else ''
+
+def _restore_booleans(target_obj, objs):
+    """Add back the boolean modifiers remembered on an INSERT's cutters."""
+    for obj in objs:
+        if not obj.kitopssynth_insert.pooled_booleans:
+            continue
+        if target_obj is not None:
+            for settings in json.loads(obj.kitopssynth_insert.pooled_booleans):
+                mod = target_obj.modifiers.new(name=settings['name'], type='BOOLEAN')
+                mod.object = obj
+                mod.operation = settings['operation']
+                if settings['solver'] is not None:
+                    mod.solver = settings['solver']
+                mod.show_expanded = False
+        obj.kitopssynth_insert.pooled_booleans = ''
+
+def can_park(insert_obj):
+    """Whether an INSERT can be parked, i.e. it is a regular INSERT that a later placement could reuse."""
+    return insert_obj is not None and \
+        insert_obj.kitopssynth_insert.placement_key != '' and \
+        not insert_obj.kitopssynth_insert.is_instancer
+
+def park(insert_obj, target_obj, layer_name):
+    """Move an INSERT out of the scene into the pool of a layer."""
+    objs = _hierarchy(insert_obj)
+    pool_collection = _pool_collection()
+    for obj in objs:
+        obj.kitopssynth_insert.pooled_collections.clear()
+        for collection in list(obj.users_collection):
+            obj.kitopssynth_insert.pooled_collections.add().collection = collection
+            collection.objects.unlink(obj)
+        pool_collection.objects.link(obj)
+    insert_obj.kitopssynth_insert.pool_layer = layer_name
+    insert_obj.kitopssynth_insert.pool_target = target_obj
+    _park_booleans(target_obj, objs)
+
+def _restore(insert_obj, target_obj):
+    """Move a parked INSERT back to the collections it was parked from."""
+    objs = _hierarchy(insert_obj)
+    pool_collection = _pool_collection()
+    for obj in objs:
+        if obj.name in pool_collection.objects:
+            pool_collection.objects.unlink(obj)
+        for collection_ref in obj.kitopssynth_insert.pooled_collections:
+            if collection_ref.collection is not None and obj.name not in collection_ref.collection.objects:
+                collection_ref.collection.objects.link(obj)
+        obj.kitopssynth_insert.pooled_collections.clear()
+        # the collections it was parked from may have been cleaned up in the meantime.
+        if not obj.users_collection:
+            if 'INSERTS' not in bpy.data.collections:
+                bpy.context.scene.collection.children.link(bpy.data.collections.new(name='INSERTS'))
+            bpy.data.collections['INSERTS'].objects.link(obj)
+    insert_obj.kitopssynth_insert.pool_layer = ''
+    insert_obj.kitopssynth_insert.pool_target = None
+    _restore_booleans(target_obj, objs)
+
+def parked(target_obj, layer_name):
+    """Returns the INSERTs parked for a target's layer."""
+    if _pool_collection_name not in bpy.data.collections:
+        return []
+    # preview INSERTs have no reserved target, so the target is the one remembered when parking.
+    return [obj for obj in bpy.data.collections[_pool_collection_name].objects
+                if obj.kitopssynth_insert.pool_layer == layer_name and obj.kitopssynth_insert.pool_target == target_obj]
+
+def take(target_obj, layer_name):
+    """Take all INSERTs parked for a target's layer back into the scene, returning them for reuse."""
+    insert_objs = parked(target_obj, layer_name)
+    for insert_obj in insert_objs:
+        _restore(insert_obj, target_obj)
+    return insert_objs
+
+def release_all():
+    """Delete all parked INSERTs."""
+    if _pool_collection_name not in bpy.data.collections:
+        return
+    pool_collection = bpy.data.collections[_pool_collection_name]
+    for insert_obj in [obj for obj in pool_collection.objects if obj.kitopssynth_insert.pool_layer]:
+        if insert_obj.name not in bpy.data.objects:
+            continue
+        if insert_obj.kitopssynth_insert.is_preview_insert:
+            inserts.delete_hierarchy(insert_obj)
+        else:
+            inserts.delete_hierarchy(insert_obj, insert_obj.kitops.reserved_target)
+    bpy.data.collections.remove(pool_collection)
+    inserts.purge_data_blocks()
+
+@persistent
+def release_handler(dummy):
+    """Release the pool when the session ends, and before saving so parked INSERTs are not written to the file."""
+    release_all()
@@ -0,0 +1,134 @@
+# Preview output for layers: all preview shapes of a layer merged into a single object.
+import bpy
+import bmesh
+import numpy as np
+from kitops.addon.utility import id
+from . import metadata, inserts, booleans, blend_cache
+
+
+def _transform(matrix, cos):
+    """Transform an (n, 3) array of coordinates by a 4x4 matrix."""
+    matrix = np.array(matrix, dtype=np.float64)
+    return cos @ matrix[:3, :3].T + matrix[:3, 3]
+
+def write_mesh(me, cos, face_vertex_indices, face_sizes, face_insert_ids=None):
+    """Write vertices and faces to an empty mesh with foreach_set, with a per face insert_id attribute for picking if given."""
+    loop_starts = np.concatenate(([0], np.cumsum(face_sizes)[:-1])).astype(np.int32)
+
+    me.vertices.add(len(cos))
+    me.vertices.foreach_set('co', np.asarray(cos, dtype=np.float32).ravel())
+    me.loops.add(len(face_vertex_indices))
+    me.loops.foreach_set('vertex_index', np.asarray(face_vertex_indices, dtype=np.int32))
+    me.polygons.add(len(face_sizes))
+    me.polygons.foreach_set('loop_start', loop_starts)
+    if not bpy.types.MeshPolygon.bl_rna.properties['loop_total'].is_readonly:
+        me.polygons.foreach_set('loop_total', np.asarray(face_sizes, dtype=np.int32))
+
+    if face_insert_ids is not None:
+        attribute = me.attributes.new('insert_id', 'INT', 'FACE')
+        attribute.data.foreach_set('value', np.asarray(face_insert_ids, dtype=np.int32))
+
+    me.update(calc_edges=True)
+    me.validate()
+
+def link_preview_object(context, layer, me):
+    """Create the object for a layer's preview mesh and register it like a preview INSERT."""
+    preview_obj = bpy.data.objects.new(me.name, me)
+    preview_obj.kitopssynth_insert.is_preview_insert = True
+    preview_obj.kitops.id = id.uuid()
+    preview_obj.color = context.scene.kitopssynth.preview_color
+
+    if 'INSERTS' not in bpy.data.collections:
+        context.scene.collection.children.link(bpy.data.collections.new(name='INSERTS'))
+    bpy.data.collections['INSERTS'].objects.link(preview_obj)
+    return preview_obj
+
+def build_fast_preview(context, layer, insert_frames):
+    """Write the bounding boxes of all of a layer's placements into one mesh object."""
+    if not insert_frames:
+        return None
+
+    matrices = inserts.calc_matrix_worlds(insert_frames)
+    bound_boxes = np.array([insert_frame.bound_box for insert_frame in insert_frames], dtype=np.float64).reshape(-1, 8, 3)
+    cos = (np.einsum('nij,nkj->nki', matrices[:, :3, :3], bound_boxes) + matrices[:, np.newaxis, :3, 3]).reshape(-1, 3)
+
+    insert_ids = np.arange(len(insert_frames), dtype=np.int32)
+    face_vertex_indices = (booleans.box_faces[np.newaxis, :, :] + (insert_ids * 8)[:, np.newaxis, np.newaxis]).ravel()
+    face_sizes = np.full(len(insert_frames) * 6, 4, dtype=np.int32)
+    face_insert_ids = np.repeat(insert_ids, 6)
+
+    me = bpy.data.meshes.new('SYNTH ' + layer.layer_name + ' Preview')
+    write_mesh(me, cos, face_vertex_indices, face_sizes, face_insert_ids)
+    return link_preview_object(context, layer, me)
+
+
+def _make_proxy(blend_path):
+    """Build the convex hull of an INSERT's objects in the space of its main object.
+
+    Returns the hull as arrays of vertex coordinates, face vertex indices and face sizes, or None if the INSERT has no faces."""
+    with metadata.linked_objects(blend_path) as (objs, main_obj):
+        if main_obj is None:
+            return None
+        meshes = [obj for obj in objs if obj.type == 'MESH' and len(obj.data.vertices)]
+        solids = [obj for obj in meshes if obj.kitops.type != 'CUTTER'] or meshes
+
+        main_inv = main_obj.matrix_world.inverted()
+        cos = []
+        for obj in solids:
+            obj_cos = np.empty(len(obj.data.vertices) * 3, dtype=np.float64)
+            obj.data.vertices.foreach_get('co', obj_cos)
+            cos.append(_transform(main_inv @ obj.matrix_world, obj_cos.reshape(-1, 3)))
+    if not cos:
+        return None
+
+    bm = bmesh.new()
+    try:
+        for co in np.concatenate(cos):
+            bm.verts.new(co)
+        bmesh.ops.convex_hull(bm, input=bm.verts)
+        bmesh.ops.delete(bm, geom=[v for v in bm.verts if not v.link_faces], context='VERTS')
+        if not bm.faces:
+            return None
+        bm.verts.index_update()
+        hull_cos = np.array([v.co[:] for v in bm.verts], dtype=np.float64)
+        face_vertex_indices = np.array([v.index for f in bm.faces for v in f.verts], dtype=np.int32)
+        face_sizes = np.array([len(f.verts) for f in bm.faces], dtype=np.int32)
+    finally:
+        bm.free()
+    return {'cos' : hull_cos, 'face_vertex_indices' : face_vertex_indices, 'face_sizes' : face_sizes}
+
+def _unpack_proxy(arrays):
+    return arrays['cos'], arrays['face_vertex_indices'], arrays['face_sizes']
+
+# convex hull proxies of INSERTs, generated once per blend and kept on disk next to the frame cache.
+_proxies = blend_cache.BlendFileCache('proxies', 1, _make_proxy, _unpack_proxy)
+
+def get_proxy(blend_path):
+    """Returns the proxy of an INSERT blend, generating and saving it if there is no up to date one on disk."""
+    return _proxies.get(blend_path)
+
+def build_proxy_preview(context, layer, insert_frames):
+    """Write the proxies of all of a layer's placements into one mesh object.
+
+    Placements of INSERTs without a proxy fall back to their bounding box."""
+    if not insert_frames:
+        return None
+
+    cos, face_vertex_indices, face_sizes, face_insert_ids = [], [], [], []
+    vertex_count = 0
+    matrices = inserts.calc_matrix_worlds(insert_frames)
+    for insert_id, insert_frame in enumerate(insert_frames):
+        proxy = get_proxy(insert_frame.op_location)
+        if proxy is None:
+            proxy = np.array(insert_frame.bound_box, dtype=np.float64), booleans.box_faces.ravel(), np.full(len(booleans.box_faces), 4, dtype=np.int32)
+        proxy_cos, proxy_face_vertex_indices, proxy_face_sizes = proxy
+
+        cos.append(_transform(matrices[insert_id], proxy_cos))
+        face_vertex_indices.append(proxy_face_vertex_indices + vertex_count)
+        face_sizes.append(proxy_face_sizes)
+        face_insert_ids.append(np.full(len(proxy_face_sizes), insert_id, dtype=np.int32))
+        vertex_count += len(proxy_cos)
+
+    me = bpy.data.meshes.new('SYNTH ' + layer.layer_name + ' Preview')
+    write_mesh(me, np.concatenate(cos), np.concatenate(face_vertex_indices), np.concatenate(face_sizes), np.concatenate(face_insert_ids))
+    return link_preview_object(context, layer, me)
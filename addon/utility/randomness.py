@@ -4,16 +4,25 @@ from mathutils import Vector
 from .. utility import addon
 
 _max_seed = 2**32 - 1
-def random_generator(context, layer):
-    """Get a randon number generator from a user provided seed."""
+def _layer_seed(context, layer):
+    """Get the seed for a layer from the user provided seeds."""
     preference = context.scene.kitopssynth
 
     if layer.seed == 0:
         seed_concatenated = int(str(preference.seed) + str(layer.index)) 
-        rng = np.random.RandomState(seed_concatenated % _max_seed)
-    else:
-        rng = np.random.RandomState((preference.seed + layer.seed) % _max_seed)
-    return rng
+        return seed_concatenated % _max_seed
+    return (preference.seed + layer.seed) % _max_seed
+
+def random_generator(context, layer):
+    """Get a randon number generator from a user provided seed."""
+    return np.random.RandomState(_layer_seed(context, layer))
+
+def random_substream(context, layer, *indices):
+    """Get a random number generator for one part of a layout, e.g. a face group or a placement.
+
+    The stream only depends on the layer seed and the indices, so drawing more or fewer numbers
+    for one part of the layout does not change the numbers drawn for any other part."""
+    return np.random.RandomState([_layer_seed(context, layer)] + [index % _max_seed for index in indices])
 
 
 def point_on_triangle(pt1, pt2, pt3, rng):
@@ -3,9 +3,10 @@ import bpy
 from mathutils import Vector, Matrix
 from sys import maxsize
 import bmesh
+import json
 from .. import property
-from kitops.addon.utility import insert, addon as kitops_addon
-from . import addon, randomness, distributors, inserts, messages
+from kitops.addon.utility import addon as kitops_addon
+from . import addon, randomness, distributors, inserts, messages, fingerprint, instancing, preview, pool, booleans, layer_collections
 import datetime
 
 
@@ -21,12 +22,13 @@ def cleanup():
 
     if 'INSERTS' in bpy.data.collections:
         for child in bpy.data.collections['INSERTS'].children:
-            if not child.objects and not child.children:
+            if not child.all_objects:
+                for grandchild in list(child.children):
+                    bpy.data.collections.remove(grandchild)
                 bpy.data.collections.remove(child)
 
-    insert.show_solid_objects()
-    insert.show_cutter_objects()
-    insert.show_wire_objects()
+    # SYNTH's objects are grouped in layer collections, so their display options are applied per collection.
+    layer_collections.apply_display()
 
 
 
@@ -111,30 +113,123 @@ def inserts_add_layer(prop, context, layer, new_insert_objs, cleanup=True):
             face_id_list = property.generate_face_id_list(target_obj)
         
 
-        if context.active_object:
-            bpy.ops.ko.synth_clear_layer('INVOKE_DEFAULT', layer_uid=layer.name, delete_all=True)
-
-        #if we have no face selections after this, just do nothing.
+        # skip the layer if it was last laid out from exactly the same inputs.
+        layer_fingerprint = fingerprint.layer_fingerprint(prop, context, layer, target_obj, face_id_list)
+        existing_layer_ref = None
         if len(face_id_list):
             key = property.generate_insert_map_key(target_obj, face_id_list)
+            if key in target_obj.kitopssynth_insert_map and layer.name in target_obj.kitopssynth_insert_map[key].layers:
+                existing_layer_ref = target_obj.kitopssynth_insert_map[key].layers[layer.name]
+        is_unchanged = existing_layer_ref is not None and fingerprint.is_materialized(existing_layer_ref, layer_fingerprint)
+
+        # when committing a preview, take the placements from the previewed plan if the layout has not changed since.
+        plan = None
+        if getattr(prop, 'use_preview_plan', False) and not is_unchanged and existing_layer_ref is not None and existing_layer_ref.plan:
+            stored_plan = json.loads(existing_layer_ref.plan)
+            if stored_plan['fingerprint'] == fingerprint.layout_fingerprint(context, layer, target_obj, face_id_list):
+                plan = stored_plan['placements']
+
+        materializer = None
+        if is_unchanged:
+            new_insert_objs.extend([insert_ref.insert_obj for insert_ref in existing_layer_ref.inserts])
+        else:
+            # take the layer's existing INSERTs out of the map so they can be moved to the new layout instead of deleted.
+            existing_objs = []
+            for insert_entry_map in target_obj.kitopssynth_insert_map:
+                if layer.name in insert_entry_map.layers:
+                    layer_ref = insert_entry_map.layers[layer.name]
+                    existing_objs.extend([insert_ref.insert_obj for insert_ref in layer_ref.inserts])
+                    layer_ref.inserts.clear()
+            existing_objs.extend(pool.take(target_obj, layer.name))
+            face_group_key = property.generate_insert_map_key(target_obj, face_id_list)
+            materializer = inserts.LayerMaterializer(existing_objs, inserts.layer_name_stamp(layer, face_group_key),
+                                                        layer.cutter_lod_size if layer.use_cutter_lod else None)
+
+            # keep the booleans off while the layer is built; they are enabled together at the end of the run.
+            if getattr(prop, 'deferred_booleans', None) is not None and prop.boolean_target is not None:
+                prop.deferred_booleans.defer_target(prop.boolean_target)
+
+            if context.active_object:
+                bpy.ops.ko.synth_clear_layer('INVOKE_DEFAULT', layer_uid=layer.name, delete_all=True)
+
+        #if we have no face selections after this, just do nothing.
+        if len(face_id_list) and not is_unchanged:
 
             # just create a new entry for target objects -> inserts.
             insert_entry_map = target_obj.kitopssynth_insert_map[key] if key in target_obj.kitopssynth_insert_map else target_obj.kitopssynth_insert_map.add()
             insert_entry_map.name = key
 
-            # intitialise points and cache them.
-            distribution_class_name = layer.distribution
-            distributor = getattr(distributors, distribution_class_name)()
-        
-            new_insert_objs_to_add = distributor.distribute(prop, context, layer)
-            new_insert_objs.extend(new_insert_objs_to_add)
-
             layer_to_update = insert_entry_map.layers[layer.name] if layer.name in insert_entry_map.layers else insert_entry_map.layers.add()
             layer_to_update.name = layer.name
 
-            for insert_obj in new_insert_objs_to_add:
+            if plan is not None:
+                batches = [[inserts.PlannedInsert.from_plan_data(data) for data in plan]]
+            else:
+                # intitialise points and cache them.
+                distribution_class_name = layer.distribution
+                distributor = getattr(distributors, distribution_class_name)()
+                batches = distributor.distribute(prop, context, layer)
+
+            preference = context.scene.kitopssynth
+            planned_frames = []
+            culled = 0
+            if preference.preview_mode and preference.preview_type in {'FAST', 'PROXY'}:
+                # merge the boxes or proxies of the whole placement plan into one preview object.
+                insert_frames = [insert_frame for placements in batches for insert_frame in placements]
+                insert_frames, culled = inserts.cull_placements(layer, insert_frames)
+                planned_frames = insert_frames
+                if preference.preview_type == 'PROXY':
+                    insert_obj = preview.build_proxy_preview(context, layer, insert_frames)
+                else:
+                    insert_obj = preview.build_fast_preview(context, layer, insert_frames)
+                if insert_obj is not None:
+                    new_insert_objs.append(insert_obj)
+                    layer_to_update.inserts.add().insert_obj = insert_obj
+            elif layer.output_mode == 'INSTANCES' and instancing.is_supported() and not preference.preview_mode:
+                # instance the whole placement plan through a single Geometry Nodes modifier.
+                insert_frames = [insert_frame for placements in batches for insert_frame in placements]
+                insert_frames, culled = inserts.cull_placements(layer, insert_frames)
+                insert_obj = instancing.build_layer_instances(prop, context, layer, target_obj, insert_frames)
                 if insert_obj is not None:
+                    new_insert_objs.append(insert_obj)
                     layer_to_update.inserts.add().insert_obj = insert_obj
+            else:
+                # the distributor streams batches of placements; materialize and register each batch as it arrives.
+                for placements in batches:
+                    placements, batch_culled = inserts.cull_placements(layer, placements)
+                    culled += batch_culled
+                    # only previews keep their plan, so only they need to hold on to every placement.
+                    if preference.preview_mode:
+                        planned_frames.extend(placements)
+                    for insert_obj in materializer.materialize(prop, context, placements):
+                        new_insert_objs.append(insert_obj)
+                        layer_to_update.inserts.add().insert_obj = insert_obj
+
+                if prop.boolean_target is not None:
+                    booleans.sync_layer(prop.boolean_target, layer, [insert_ref.insert_obj for insert_ref in layer_to_update.inserts])
+                    if getattr(prop, 'deferred_booleans', None) is not None:
+                        prop.deferred_booleans.defer_target(prop.boolean_target)
+
+            layer_collections.assign(context, layer, [insert_ref.insert_obj for insert_ref in layer_to_update.inserts])
+            layer_to_update.fingerprint = layer_fingerprint
+
+            if culled:
+                if layer.cull_mode == 'SKIP':
+                    messages.add_message(context, str(culled) + ' INSERTs below the cull size were skipped for layer "' + layer.layer_name + '".')
+                else:
+                    messages.add_message(context, str(culled) + ' INSERTs below the cull size were added without booleans for layer "' + layer.layer_name + '".')
+
+            # keep the plan of a preview so that it can be committed without laying it out again.
+            if preference.preview_mode:
+                layer_to_update.plan = json.dumps({
+                    'fingerprint' : fingerprint.layout_fingerprint(context, layer, target_obj, face_id_list),
+                    'placements' : [insert_frame.to_plan_data(matrix_world) for insert_frame, matrix_world in zip(planned_frames, inserts.calc_matrix_worlds(planned_frames).tolist())]
+                })
+            else:
+                layer_to_update.plan = ''
+
+        if materializer is not None:
+            materializer.remove_unused(target_obj)
 
         # reset the selection for next time.
         context.view_layer.objects.active = old_active